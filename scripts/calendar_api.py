@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+🛰️ GitHub Contribution Calendar API
+One slim GraphQL payload (counts + dates only) shared by the spaceship and
+stats generators. Levels are derived locally, see levels.py.
+Responses are requested gzip/deflate-compressed and decoded incrementally:
+days are pulled out of `weeks` → `contributionDays` as chunks arrive, so the
+raw body and full JSON tree are never held in memory at once.
+A calendar can also travel as a compact packed payload (start date + counts),
+small enough for a repository_dispatch client_payload, see pack_calendar().
+"""
+
+import codecs, hashlib, json, re, urllib.request, zlib
+from datetime import date, timedelta
+
+from profiling import hook
+
+GITHUB_API = "https://api.github.com/graphql"
+CHUNK = 16 * 1024
+
+CALENDAR_QUERY = """query($u:String!){user(login:$u){contributionsCollection{
+    contributionCalendar{totalContributions weeks{contributionDays{
+      contributionCount date weekday
+    }}}}}}"""
+
+_TOTAL_RE = re.compile(r'"totalContributions"\s*:\s*(\d+)')
+_DAYS_RE = re.compile(r'"contributionDays"\s*:\s*\[')
+_WS = " \t\r\n,"
+
+
+def iter_body(resp, chunk=CHUNK):
+    """Yield decoded text chunks of a (possibly gzip/deflate-encoded) response.
+    Raises RuntimeError if a compressed body ends before its stream does."""
+    enc = (resp.headers.get("Content-Encoding") or "").lower()
+    if enc in ("gzip", "x-gzip"):
+        dec = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif enc == "deflate":
+        dec = None  # zlib-wrapped or raw deflate; decided on the first chunk
+    else:
+        dec = False
+    text = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        raw = resp.read(chunk)
+        if not raw:
+            break
+        if dec is None:
+            # zlib streams start with CMF 0x78; otherwise assume raw deflate
+            dec = zlib.decompressobj(zlib.MAX_WBITS if raw[0] == 0x78 else -zlib.MAX_WBITS)
+        if dec:
+            raw = dec.decompress(raw)
+        if raw:
+            yield text.decode(raw)
+    if dec:
+        tail = dec.flush()
+        if tail:
+            yield text.decode(tail)
+        if not dec.eof:
+            raise RuntimeError("truncated calendar response: compressed stream ended early")
+    yield text.decode(b"", final=True)
+
+
+def iter_calendar(chunks):
+    """Incrementally walk a calendar response.
+
+    Yields ("total", n) once totalContributions is seen, ("week", None) at the
+    start of each contributionDays array and ("day", {...}) for every day.
+    Raises RuntimeError carrying the API errors if no calendar is found, and
+    RuntimeError if the body ends mid-calendar (inside a week, or before the
+    document closes), so a cut-off response never passes for a short one.
+    """
+    dec = json.JSONDecoder()
+    buf, pos = "", 0
+    skel, mark = [], 0     # the document minus the days (buf[mark:pos] not yet saved)
+    in_days = found = total_seen = False
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        mark, pos = max(mark - pos, 0), 0
+        while True:
+            if not in_days:
+                if not total_seen:
+                    m = _TOTAL_RE.search(buf, pos)
+                    # need the whole number, so the match must not touch the buffer end
+                    if m and m.end() < len(buf):
+                        total_seen = True
+                        yield "total", int(m.group(1))
+                m = _DAYS_RE.search(buf, pos)
+                if not m:
+                    # keep a tail long enough for a key split across chunks
+                    pos = max(pos, len(buf) - 64)
+                    skel.append(buf[mark:pos]); mark = pos
+                    break
+                skel.append(buf[mark:m.end()])
+                pos = m.end(); in_days = found = True
+                yield "week", None
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                mark = pos; pos += 1; in_days = False
+                continue
+            try:
+                day, end = dec.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # partial object; wait for more bytes
+            pos = end
+            yield "day", day
+    # what's left with the days taken out must still be one complete JSON document
+    try:
+        doc = None if in_days else json.loads("".join(skel) + buf[mark:])
+    except ValueError:
+        doc = None
+    if not found:
+        errs = doc.get("errors") if isinstance(doc, dict) else None
+        raise RuntimeError(f"no contribution calendar in response: {errs}")
+    if doc is None or not total_seen:
+        raise RuntimeError("truncated or malformed calendar response")
+
+
+@hook("fetch_calendar")
+def fetch_calendar(username, token):
+    """Fetch the contribution calendar. Returns (total, weeks) where weeks is a
+    list of weeks, each a list of {"date", "count", "weekday"} days."""
+    p = json.dumps({"query": CALENDAR_QUERY, "variables": {"u": username}}).encode()
+    req = urllib.request.Request(GITHUB_API, data=p, headers={
+        "Authorization": f"bearer {token}", "Content-Type": "application/json",
+        "Accept-Encoding": "gzip, deflate"})
+    total, weeks = 0, []
+    with urllib.request.urlopen(req) as r:
+        for kind, val in iter_calendar(iter_body(r)):
+            if kind == "day":
+                weeks[-1].append({"date": val["date"], "count": val["contributionCount"], "weekday": val["weekday"]})
+            elif kind == "week":
+                weeks.append([])
+            else:
+                total = val
+    return total, weeks
+
+
+def calendar_digest(weeks):
+    """Stable sha1 of a calendar's weeks, to tell whether anything changed."""
+    return hashlib.sha1(json.dumps(weeks, sort_keys=True).encode()).hexdigest()
+
+
+def pack_calendar(total, weeks):
+    """(total, weeks) → {"total", "start", "counts"}: days are consecutive, so the
+    first date and the counts in order are enough to rebuild every week."""
+    days = [d for w in weeks for d in w]
+    return {"total": total, "start": days[0]["date"] if days else None, "counts": [d["count"] for d in days]}
+
+
+def unpack_calendar(packed):
+    """Inverse of pack_calendar(); weeks break on Sunday (weekday 0) as on GitHub."""
+    weeks, day = [], date.fromisoformat(packed["start"]) if packed["start"] else None
+    for n in packed["counts"]:
+        wd = (day.weekday() + 1) % 7
+        if wd == 0 or not weeks:
+            weeks.append([])
+        weeks[-1].append({"date": day.isoformat(), "count": n, "weekday": wd})
+        day += timedelta(days=1)
+    return packed["total"], weeks
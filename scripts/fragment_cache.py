@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+🧱 Render Fragment Cache
+Persistent memo of SVG/CSS fragments keyed by the inputs that produce them.
+Fragment functions must be pure in their arguments plus module constants;
+the key is the function name + args, and the file is invalidated whenever
+the function code or the caller-supplied salt (theme/timing constants) changes.
+Between runs usually only the newest column changes, so everything else is
+spliced in from the cache instead of being re-formatted.
+"""
+
+import hashlib, json, os, tempfile
+
+
+def source_hash(*paths):
+    """Digest of source files, for salts: fragments that call helpers (or read
+    module constants) change when those files do, not just their own bytecode."""
+    h = hashlib.sha1()
+    for p in paths:
+        with open(p, "rb") as f: h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def _fingerprint(fn):
+    h = hashlib.sha1()
+    def feed(code):
+        h.update(code.co_code)
+        for c in code.co_consts:  # nested code objects (genexprs, lambdas) repr with an address
+            feed(c) if hasattr(c, "co_code") else h.update(repr(c).encode())
+    feed(fn.__code__)
+    return h.hexdigest()[:12]
+
+
+class FragmentCache:
+    def __init__(self, path=None, salt=""):
+        self.path, self.salt = path, salt
+        self.store, self.used = {}, {}
+        self.hits = self.misses = 0
+        self._fps = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f: data = json.load(f)
+                if data.get("salt") == salt:
+                    self.store = data.get("fragments", {})
+            except (OSError, ValueError):
+                pass  # corrupt or unreadable cache: start cold
+
+    def get(self, fn, *args):
+        """Return fn(*args), from the cache when the same inputs were seen before."""
+        fp = self._fps.get(fn)
+        if fp is None:
+            fp = self._fps[fn] = f"{fn.__name__}@{_fingerprint(fn)}"
+        key = f"{fp}{args!r}"
+        text = self.store.get(key)
+        if text is None:
+            text = fn(*args)
+            self.misses += 1
+        else:
+            self.hits += 1
+        self.used[key] = text
+        return text
+
+    def save(self):
+        """Persist only the fragments used this run, so the file never outgrows one render."""
+        if not self.path:
+            return
+        d = os.path.dirname(self.path) or "."
+        os.makedirs(d, exist_ok=True)
+        # unique temp file: concurrent renders (refresh_scheduler) must not share one
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=os.path.basename(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"salt": self.salt, "fragments": self.used}, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def __repr__(self):
+        return f"FragmentCache({self.hits} hits, {self.misses} misses)"
@@ -8,23 +8,22 @@
 - Ship NEVER leaves the screen
 """
 
-import os, json, math, random, urllib.request
-from datetime import datetime, timedelta
-
-GITHUB_API = "https://api.github.com/graphql"
+import os, math, random
+from datetime import date, datetime, timedelta
+
+from calendar_api import fetch_calendar
+from levels import apply_levels
+from fragment_cache import FragmentCache, source_hash
+from profiling import hook
+from registry import renderer
+from snapshot import Snapshot
+import svg_emit
+from svg_emit import group, use
 
 BG    = "#0d1117"
 EMPTY = "#161b22"
 LV    = ["#161b22", "#1a6334", "#006d32", "#26a641", "#39d353"]
 
-LEVEL_MAP = {
-    "NONE": 0,
-    "FIRST_QUARTILE": 1,
-    "SECOND_QUARTILE": 2,
-    "THIRD_QUARTILE": 3,
-    "FOURTH_QUARTILE": 4,
-}
-
 SHIP_C  = "#00ff88"; SHIP_C2 = "#00cc66"
 LASER_C = "#00ffcc"; BOLT_C  = "#00d4ff"
 FLASH_C = "#ffffff"; BOOM_C  = "#ff6600"; BOOM_C2 = "#ffcc00"
@@ -34,48 +33,41 @@ MEGA_C  = "#ff0000"; MEGA_C2 = "#ff3300"; MEGA_C3 = "#ff6600"
 CELL = 10; GAP = 3; STEP = 13; ROWS = 7
 ML = 55; MT = 80; MR = 35; MB = 25
 CYCLE = 28
+SHOT_BUDGET = 12  # max shot groups (bolt/trail/xpl sets) per cycle
+WINDOW = 54       # weeks animated at once in windowed mode; a calendar year spans up to 54 columns
+MINI_ROW = 3      # history strip: row pitch in px
+
+# Everything the cached fragments depend on: theme/layout constants plus the
+# source of this module and the emit helpers they call; any change invalidates the cache
+FRAGMENT_SALT = repr((CYCLE, CELL, STEP, ROWS, ML, MT, LV, EMPTY, FLASH_C, BOOM_C, BOOM_C2, MEGA_C, LASER_C, BOLT_C,
+                      source_hash(__file__, svg_emit.__file__)))
 
 WEEKDAY_LABELS = {1: "Mon", 3: "Wed", 5: "Fri"}
 MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
 
 
-def get_lv(c):
-    if c == 0: return 0
-    if c <= 3: return 1
-    if c <= 6: return 2
-    if c <= 9: return 3
-    return 4
+@hook("fetch_contributions")
+def fetch_contributions(username, token):
+    _, weeks = fetch_calendar(username, token)
+    grid, dates = grid_from_weeks(weeks)
+    total_green = sum(1 for w in grid for d in w if d["level"] > 0)
+    by_level = {i: sum(1 for w in grid for d in w if d["level"] == i) for i in range(5)}
+    print(f"   API returned {len(grid)} weeks")
+    print(f"   Green squares: {total_green} (L1:{by_level[1]} L2:{by_level[2]} L3:{by_level[3]} L4:{by_level[4]})")
+    return grid, dates
 
 
-def fetch_contributions(username, token):
-    q = """query($u:String!){user(login:$u){contributionsCollection{
-    contributionCalendar{weeks{contributionDays{
-      contributionCount contributionLevel date weekday
-    }}}}}}"""
-    p = json.dumps({"query": q, "variables": {"u": username}}).encode()
-    req = urllib.request.Request(GITHUB_API, data=p, headers={
-        "Authorization": f"bearer {token}", "Content-Type": "application/json"})
-    with urllib.request.urlopen(req) as r:
-        data = json.loads(r.read().decode())
-    weeks = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
+def grid_from_weeks(weeks):
     grid, dates = [], []
-    for w in weeks:
-        days = w["contributionDays"]
-        col = []
+    for days in weeks:
+        # place days in their weekday row (Sunday = 0), so a partial first week
+        # sits at the bottom of its column like on GitHub and in snapshot.GridView
+        col = [{"level": 0, "count": 0} for _ in range(7)]
         for d in days:
-            level_str = d.get("contributionLevel", "NONE")
-            level = LEVEL_MAP.get(level_str, 0)
-            if level == 0 and d["contributionCount"] > 0:
-                level = get_lv(d["contributionCount"])
-            col.append({"level": level, "count": d["contributionCount"]})
-        while len(col) < 7:
-            col.append({"level": 0, "count": 0})
+            col[d["weekday"]]["count"] = d["count"]
         grid.append(col)
         dates.append(days[0]["date"] if days else None)
-    total_green = sum(1 for w in grid for d in w if d["level"] > 0)
-    by_level = {i: sum(1 for w in grid for d in w if d["level"] == i) for i in range(5)}
-    print(f"   API returned {len(grid)} weeks")
-    print(f"   Green squares: {total_green} (L1:{by_level[1]} L2:{by_level[2]} L3:{by_level[3]} L4:{by_level[4]})")
+    apply_levels(grid)
     return grid, dates
 
 
@@ -89,8 +81,9 @@ def demo_grid():
                 c = random.choices([0,1,2,3], weights=[55,25,12,8])[0]
             else:
                 c = random.choices([0,1,2,3,5,8,12], weights=[25,20,18,15,12,7,3])[0]
-            col.append({"level": get_lv(c), "count": c})
+            col.append({"level": 0, "count": c})
         grid.append(col)
+    apply_levels(grid)
     today = datetime.now()
     ds = (today.weekday() + 1) % 7
     ls = today - timedelta(days=ds)
@@ -110,8 +103,7 @@ def get_month_labels(dates):
     return labels
 
 
-def group_targets(grid):
-    tc = [ci for ci, w in enumerate(grid) if any(d["level"] > 0 for d in w)]
+def _greedy_groups(tc):
     groups, i = [], 0
     while i < len(tc):
         g = [tc[i]]
@@ -121,14 +113,227 @@ def group_targets(grid):
     return groups
 
 
-def build_svg(grid, dates):
+def _segment(tc, k):
+    """Split sorted columns into k contiguous groups minimising within-group
+    squared distance (optimal 1-D k-means via DP, O(k·n²))."""
+    n = len(tc)
+    ps = [0]; ps2 = [0]
+    for c in tc:
+        ps.append(ps[-1] + c); ps2.append(ps2[-1] + c*c)
+    def cost(i, j):  # SSE of tc[i:j]
+        s = ps[j] - ps[i]
+        return (ps2[j] - ps2[i]) - s*s / (j - i)
+    INF = float("inf")
+    dp = [[INF] * (n+1) for _ in range(k+1)]
+    cut = [[0] * (n+1) for _ in range(k+1)]
+    dp[0][0] = 0.0
+    for m in range(1, k+1):
+        for j in range(m, n - (k - m) + 1):
+            best, bi = INF, m - 1
+            for i in range(m - 1, j):
+                v = dp[m-1][i] + cost(i, j)
+                if v < best: best, bi = v, i
+            dp[m][j] = best; cut[m][j] = bi
+    groups, j = [], n
+    for m in range(k, 0, -1):
+        i = cut[m][j]
+        groups.append(tc[i:j]); j = i
+    return groups[::-1]
+
+
+@hook("group_targets")
+def group_targets(grid, budget=SHOT_BUDGET):
+    """Pack target columns into at most `budget` shot groups.
+
+    Sparse calendars keep the natural grouping (≤3 columns within 2 weeks);
+    denser ones are clustered down to the budget. Every column with a green
+    cell stays in exactly one group, so every green cell is still destroyed.
+    """
+    tc = [ci for ci, w in enumerate(grid) if any(d["level"] > 0 for d in w)]
+    groups = _greedy_groups(tc)
+    if len(groups) <= budget:
+        return groups
+    return _segment(tc, max(1, budget))
+
+
+# === CACHEABLE FRAGMENTS ===
+# Pure functions of their arguments (+ module constants), memoised across runs
+# by FragmentCache; build_svg() calls them through frag(fn, *args).
+
+def _render(fn, *args):
+    return fn(*args)
+
+
+def _ripple(ci, ri, cols, mega_hit):
+    # Mega explosion ripple: squares farther from the centre blow up later
+    dx = abs(ci - cols//2); dy = abs(ri - ROWS//2)
+    dist = math.sqrt(dx*dx + dy*dy)
+    maxd = math.sqrt((cols//2)**2 + (ROWS//2)**2)
+    return mega_hit + (dist / maxd) * 2.0
+
+
+def frag_shot_css(gi, ap, bys, bye):
+    pf = ap + 0.1; pt = ap + 0.5; ph = ap + 0.8; pg = ap + 1.0
+    return f'''@keyframes bolt{gi} {{
+  0%,{max(pf-0.1,0):.2f}% {{ cy:{bys}; opacity:0; r:0; }}
+  {pf:.2f}% {{ cy:{bys}; opacity:1; r:4; }}
+  {pt:.2f}% {{ cy:{(bys+bye)//2}; opacity:1; r:3; }}
+  {ph:.2f}% {{ cy:{bye}; opacity:1; r:5; }}
+  {pg:.2f}% {{ cy:{bye}; opacity:0; r:0; }}
+  100% {{ opacity:0; r:0; }}
+}}
+.bolt{gi} {{ animation:bolt{gi} {CYCLE}s linear infinite; }}
+@keyframes trail{gi} {{
+  0%,{max(pf-0.1,0):.2f}% {{ opacity:0; }}
+  {pf:.2f}% {{ opacity:.8; }}
+  {ph:.2f}% {{ opacity:.5; }}
+  {pg:.2f}% {{ opacity:0; }}
+  100% {{ opacity:0; }}
+}}
+.trail{gi} {{ animation:trail{gi} {CYCLE}s linear infinite; }}
+@keyframes xpl{gi} {{
+  0%,{max(ph-0.05,0):.2f}% {{ r:0; opacity:0; }}
+  {ph:.2f}% {{ r:8; opacity:1; }}
+  {min(ph+0.4,99):.2f}% {{ r:18; opacity:.5; }}
+  {min(ph+0.8,99):.2f}% {{ r:24; opacity:0; }}
+  100% {{ r:0; opacity:0; }}
+}}
+.xpl{gi} {{ animation:xpl{gi} {CYCLE}s linear infinite; }}'''
+
+
+def frag_shot_cell(ci, ri, level, cols, ph, mega_hit, rebuild_start, rebuild_dur):
+    sid = f"c{ci}r{ri}"; clr = LV[level]
+    pfl = min(ph+0.1,99); psh = min(ph+0.3,99); pdd = min(ph+0.6,99)
+    mph = _ripple(ci, ri, cols, mega_hit)
+    mpfl = min(mph+0.15,99); mpsh = min(mph+0.4,99); mpdd = min(mph+0.8,99)
+    rb_s = rebuild_start + (ci/cols)*rebuild_dur
+    rb_e = min(rb_s+2.0,96); rb_set = min(rb_e+1.0,98)
+    return f'''@keyframes d{sid} {{
+  0%,{max(ph-0.1,0):.2f}% {{ fill:{clr}; transform:scale(1); }}
+  {ph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.6); }}
+  {pfl:.2f}% {{ fill:{BOOM_C2}; transform:scale(1.3); }}
+  {psh:.2f}% {{ fill:{BOOM_C}; transform:scale(.4); }}
+  {pdd:.2f}% {{ fill:{EMPTY}; transform:scale(1); }}
+  {max(mph-0.1,pdd+0.1):.2f}% {{ fill:{EMPTY}; transform:scale(1); }}
+  {mph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.5); }}
+  {mpfl:.2f}% {{ fill:{MEGA_C}; transform:scale(1.2); }}
+  {mpsh:.2f}% {{ fill:{BOOM_C}; transform:scale(.3); }}
+  {mpdd:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
+  {rb_s:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
+  {rb_e:.2f}% {{ fill:{clr}; transform:scale(1.15); }}
+  {rb_set:.2f}% {{ fill:{clr}; transform:scale(1); }}
+  100% {{ fill:{clr}; transform:scale(1); }}
+}}
+.{sid} {{ animation:d{sid} {CYCLE}s linear infinite; transform-origin:center; transform-box:fill-box; }}'''
+
+
+def frag_mega_cell(ci, ri, level, cols, mega_hit, rebuild_start, rebuild_dur):
+    sid = f"c{ci}r{ri}"; clr = LV[level]
+    ph = _ripple(ci, ri, cols, mega_hit)
+    pfl = min(ph+0.15,99); psh = min(ph+0.4,99); pdd = min(ph+0.8,99)
+    rb_s = rebuild_start + (ci/cols)*rebuild_dur
+    rb_e = min(rb_s+2.0,96); rb_set = min(rb_e+1.0,98)
+    return f'''@keyframes d{sid} {{
+  0%,{max(ph-0.1,0):.2f}% {{ fill:{clr}; transform:scale(1); }}
+  {ph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.5); }}
+  {pfl:.2f}% {{ fill:{MEGA_C}; transform:scale(1.2); }}
+  {psh:.2f}% {{ fill:{BOOM_C}; transform:scale(.3); }}
+  {pdd:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
+  {rb_s:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
+  {rb_e:.2f}% {{ fill:{clr}; transform:scale(1.1); }}
+  {rb_set:.2f}% {{ fill:{clr}; transform:scale(1); }}
+  100% {{ fill:{clr}; transform:scale(1); }}
+}}
+.{sid} {{ animation:d{sid} {CYCLE}s linear infinite; transform-origin:center; transform-box:fill-box; }}'''
+
+
+# Shared geometry and the inherited presentation attributes hoisted onto each
+# fragment run's <g>; the fragments below carry only what differs per element.
+# `filter` is not inherited (on a <g> it blurs the composited group), so each
+# glowing element keeps its own.
+CELL_DEF  = f'<rect id="cell" width="{CELL}" height="{CELL}" rx="2"/>'
+CELL_G    = dict(fill=EMPTY)   # level-0 cells inherit it
+TRAIL_G   = dict(stroke=LASER_C, stroke_width=2, stroke_linecap="round")
+BOLT_G    = dict(fill=BOLT_C)
+XPL_G     = dict(fill=BOOM_C2)
+LABEL_G   = dict(fill=LABEL_C, font_family="Segoe UI,Helvetica,Arial,sans-serif", font_size=9, fill_opacity=".8")
+
+
+def frag_cell_rect(ci, ri, level):
+    return use("cell", class_=f"c{ci}r{ri}", x=ML + ci * STEP, y=MT + ri * STEP, fill=LV[level] if level else None)
+
+
+# Whole-column fragments: a warm render costs one lookup per week, not per cell.
+# ph is the column's shot hit time, or None when no shot targets it.
+
+def frag_column_css(ci, levels, cols, ph, mega_hit, rebuild_start, rebuild_dur):
+    return "\n".join(frag_shot_cell(ci, ri, lv, cols, ph, mega_hit, rebuild_start, rebuild_dur)
+                     if lv and ph is not None else frag_mega_cell(ci, ri, lv, cols, mega_hit, rebuild_start, rebuild_dur)
+                     for ri, lv in enumerate(levels))
+
+
+def frag_column_cells(ci, levels):
+    return "\n".join(frag_cell_rect(ci, ri, lv) for ri, lv in enumerate(levels))
+
+
+def frag_trail(gi, bx, y1, y2):
+    return f'<line class="trail{gi}" x1="{bx}" y1="{y1}" x2="{bx}" y2="{y2}" opacity="0" filter="url(#boltglow)"/>'
+
+
+def frag_bolt(gi, bx, cy):
+    return f'<circle class="bolt{gi}" cx="{bx}" cy="{cy}" r="0" opacity="0" filter="url(#boltglow)"/>'
+
+
+def frag_xpl(gi, ex, cy):
+    return f'<circle class="xpl{gi}" cx="{ex}" cy="{cy}" r="0" opacity="0" filter="url(#boomglow)"/>'
+
+
+def window_start(cols, window, cycle=None):
+    """First column of the animated window. Successive cycles pan oldest → newest
+    one window at a time and wrap; cycle=None pins the most recent window."""
+    if cols <= window: return 0
+    stops = list(range(0, cols - window, window)) + [cols - window]
+    return stops[-1] if cycle is None else stops[cycle % len(stops)]
+
+
+def history_strip(history, start, window, x0, y0, width):
+    """Static minimap of the whole history: one <path> per level, plus a frame
+    marking the animated window. Cost is a handful of elements, not one per cell."""
+    n = len(history); p = width / n; w = max(p - .4, .6)
+    paths = {lv: [] for lv in range(1, 5)}
+    for ci, week in enumerate(history):
+        x = x0 + ci * p
+        for ri, day in enumerate(week):
+            if day["level"]:
+                paths[day["level"]].append(f"M{x:.1f} {y0 + ri*MINI_ROW}h{w:.1f}v{MINI_ROW-1}h-{w:.1f}z")
+    out = [f'<rect x="{x0}" y="{y0}" width="{width}" height="{ROWS*MINI_ROW-1}" fill="{EMPTY}"/>']
+    for lv, d in paths.items():
+        if d: out.append(f'<path d="{"".join(d)}" fill="{LV[lv]}"/>')
+    out.append(f'<rect x="{x0 + start*p - .5:.1f}" y="{y0 - 1.5}" width="{window*p + 1:.1f}" height="{ROWS*MINI_ROW + 2}" fill="none" stroke="{SHIP_C}" stroke-width="1" rx="1" opacity=".8"/>')
+    return out
+
+
+@hook("build_svg")
+def build_svg(grid, dates, budget=SHOT_BUDGET, window=None, cycle=None, cache=None):
+    """Render the spaceship SVG. With `window` set and a longer grid, only that
+    many weeks are animated; the full history is drawn as a static strip below.
+    Per-cell and per-shot fragments go through `cache` (a FragmentCache) if given."""
+    frag = cache.get if cache is not None else _render
+    history = None
+    if window and len(grid) > window:
+        start = window_start(len(grid), window, cycle)
+        history = grid
+        grid, dates = grid[start:start+window], dates[start:start+window]
     COLS = len(grid)
     GW = COLS * STEP - GAP
     GH = ROWS * STEP - GAP
     W = ML + GW + MR
     H = MT + GH + MB
-    groups = group_targets(grid)
-    print(f"   Grid: {COLS}x{ROWS} = {W}x{H}px, {len(groups)} shot groups")
+    MH = ROWS * MINI_ROW + 12 if history else 0   # extra canvas height for the strip
+    groups = group_targets(grid, budget)
+    print(f"   Grid: {COLS}x{ROWS} = {W}x{H + MH}px, {len(groups)} shot groups")
+    if history:
+        print(f"   Window: weeks {start}-{start + COLS - 1} of {len(history)}")
 
     fly_end_pct = 43.0
     CENTER_ARRIVE = 49.0
@@ -160,7 +365,7 @@ def build_svg(grid, dates):
     TYPE_Y = H // 2 + 25
 
     svg = []
-    svg.append(f'''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}">
+    svg.append(f'''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H + MH}" viewBox="0 0 {W} {H + MH}">
 <defs>
   <filter id="glow"><feGaussianBlur stdDeviation="1.5" result="b"/><feMerge><feMergeNode in="b"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
   <filter id="boltglow"><feGaussianBlur stdDeviation="3" result="b"/><feMerge><feMergeNode in="b"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
@@ -168,11 +373,13 @@ def build_svg(grid, dates):
   <filter id="megaglow"><feGaussianBlur stdDeviation="8" result="b"/><feMerge><feMergeNode in="b"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
   <filter id="shockglow"><feGaussianBlur stdDeviation="4" result="b"/><feMerge><feMergeNode in="b"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
   <filter id="textglow"><feGaussianBlur stdDeviation="2" result="b"/><feMerge><feMergeNode in="b"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
+  {CELL_DEF}
   <clipPath id="typeClip"><rect class="typeReveal" x="{TYPE_X}" y="{TYPE_Y - TYPE_FONT_SIZE}" width="0" height="{TYPE_FONT_SIZE + 10}"/></clipPath>
 </defs>''')
 
     css = ['<style>']
     css.append('@keyframes tw { 0%,100%{opacity:.1} 50%{opacity:.85} }')
+    css.append('.st { opacity:.2; animation:tw var(--d) ease var(--l) infinite; }')
 
     # === SHIP X: flies right, exits right, returns to center, exits left ===
     xs = ML + 5                    # start: left edge of grid (visible)
@@ -255,72 +462,14 @@ def build_svg(grid, dates):
     for gi, grp in enumerate(groups):
         cc = grp[len(grp)//2]
         ap = (cc / COLS) * fly_end_pct
-        pf = ap + 0.1; pt = ap + 0.5; ph = ap + 0.8; pg = ap + 1.0
-        bys = SHIP_Y + 12; bye = MT + GH//2
-        css.append(f'''@keyframes bolt{gi} {{
-  0%,{max(pf-0.1,0):.2f}% {{ cy:{bys}; opacity:0; r:0; }}
-  {pf:.2f}% {{ cy:{bys}; opacity:1; r:4; }}
-  {pt:.2f}% {{ cy:{(bys+bye)//2}; opacity:1; r:3; }}
-  {ph:.2f}% {{ cy:{bye}; opacity:1; r:5; }}
-  {pg:.2f}% {{ cy:{bye}; opacity:0; r:0; }}
-  100% {{ opacity:0; r:0; }}
-}}
-.bolt{gi} {{ animation:bolt{gi} {CYCLE}s linear infinite; }}''')
-        css.append(f'''@keyframes trail{gi} {{
-  0%,{max(pf-0.1,0):.2f}% {{ opacity:0; }}
-  {pf:.2f}% {{ opacity:.8; }}
-  {ph:.2f}% {{ opacity:.5; }}
-  {pg:.2f}% {{ opacity:0; }}
-  100% {{ opacity:0; }}
-}}
-.trail{gi} {{ animation:trail{gi} {CYCLE}s linear infinite; }}''')
-        css.append(f'''@keyframes xpl{gi} {{
-  0%,{max(ph-0.05,0):.2f}% {{ r:0; opacity:0; }}
-  {ph:.2f}% {{ r:8; opacity:1; }}
-  {min(ph+0.4,99):.2f}% {{ r:18; opacity:.5; }}
-  {min(ph+0.8,99):.2f}% {{ r:24; opacity:0; }}
-  100% {{ r:0; opacity:0; }}
-}}
-.xpl{gi} {{ animation:xpl{gi} {CYCLE}s linear infinite; }}''')
+        css.append(frag(frag_shot_css, gi, ap, SHIP_Y + 12, MT + GH//2))
 
-    # === INDIVIDUAL GREEN SQUARE DESTROY ===
-    shot_set = set()
+    # === GREEN SQUARE DESTROY: hit time of each targeted column's shot ===
+    col_hit = {}
     for gi, grp in enumerate(groups):
         cc = grp[len(grp)//2]
-        ap = (cc / COLS) * fly_end_pct
-        ph = ap + 0.8
-        for ci in grp:
-            for ri, day in enumerate(grid[ci]):
-                if day["level"] == 0: continue
-                shot_set.add((ci, ri))
-                sid = f"c{ci}r{ri}"; clr = LV[day["level"]]
-                pfl = min(ph+0.1,99); psh = min(ph+0.3,99); pdd = min(ph+0.6,99)
-                # Mega explosion ripple for this square
-                dx = abs(ci - COLS//2); dy = abs(ri - ROWS//2)
-                dist = math.sqrt(dx*dx + dy*dy)
-                maxd = math.sqrt((COLS//2)**2 + (ROWS//2)**2)
-                ripple = (dist / maxd) * 2.0
-                mph = MEGA_HIT + ripple
-                mpfl = min(mph+0.15,99); mpsh = min(mph+0.4,99); mpdd = min(mph+0.8,99)
-                rb_s = REBUILD_START + (ci/COLS)*REBUILD_DUR
-                rb_e = min(rb_s+2.0,96); rb_set = min(rb_e+1.0,98)
-                css.append(f'''@keyframes d{sid} {{
-  0%,{max(ph-0.1,0):.2f}% {{ fill:{clr}; transform:scale(1); }}
-  {ph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.6); }}
-  {pfl:.2f}% {{ fill:{BOOM_C2}; transform:scale(1.3); }}
-  {psh:.2f}% {{ fill:{BOOM_C}; transform:scale(.4); }}
-  {pdd:.2f}% {{ fill:{EMPTY}; transform:scale(1); }}
-  {max(mph-0.1,pdd+0.1):.2f}% {{ fill:{EMPTY}; transform:scale(1); }}
-  {mph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.5); }}
-  {mpfl:.2f}% {{ fill:{MEGA_C}; transform:scale(1.2); }}
-  {mpsh:.2f}% {{ fill:{BOOM_C}; transform:scale(.3); }}
-  {mpdd:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
-  {rb_s:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
-  {rb_e:.2f}% {{ fill:{clr}; transform:scale(1.15); }}
-  {rb_set:.2f}% {{ fill:{clr}; transform:scale(1); }}
-  100% {{ fill:{clr}; transform:scale(1); }}
-}}
-.{sid} {{ animation:d{sid} {CYCLE}s linear infinite; transform-origin:center; transform-box:fill-box; }}''')
+        ph = (cc / COLS) * fly_end_pct + 0.8
+        col_hit.update((ci, ph) for ci in grp)
 
     # === MEGA LASER BEAM ===
     css.append(f'''@keyframes megaBeam {{
@@ -405,70 +554,43 @@ def build_svg(grid, dates):
 .typeCursor {{ animation:typeCursor {CYCLE}s linear infinite; }}''')
     css.append(f'@keyframes blink {{ 0%,100% {{ opacity:1 }} 50% {{ opacity:0 }} }}')
 
-    # === ALL REMAINING SQUARES: MEGA DESTROY ===
+    # === EVERY SQUARE: shot (green, targeted) or mega destroy, one fragment per column ===
     for ci, week in enumerate(grid):
-        for ri, day in enumerate(week):
-            if (ci, ri) in shot_set: continue
-            sid = f"c{ci}r{ri}"; clr = LV[day["level"]]
-            dx = abs(ci - COLS//2); dy = abs(ri - ROWS//2)
-            dist = math.sqrt(dx*dx + dy*dy)
-            maxd = math.sqrt((COLS//2)**2 + (ROWS//2)**2)
-            ripple = (dist / maxd) * 2.0
-            ph = MEGA_HIT + ripple
-            pfl = min(ph+0.15,99); psh = min(ph+0.4,99); pdd = min(ph+0.8,99)
-            rb_s = REBUILD_START + (ci/COLS)*REBUILD_DUR
-            rb_e = min(rb_s+2.0,96); rb_set = min(rb_e+1.0,98)
-            css.append(f'''@keyframes d{sid} {{
-  0%,{max(ph-0.1,0):.2f}% {{ fill:{clr}; transform:scale(1); }}
-  {ph:.2f}% {{ fill:{FLASH_C}; transform:scale(1.5); }}
-  {pfl:.2f}% {{ fill:{MEGA_C}; transform:scale(1.2); }}
-  {psh:.2f}% {{ fill:{BOOM_C}; transform:scale(.3); }}
-  {pdd:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
-  {rb_s:.2f}% {{ fill:{EMPTY}; transform:scale(0); }}
-  {rb_e:.2f}% {{ fill:{clr}; transform:scale(1.1); }}
-  {rb_set:.2f}% {{ fill:{clr}; transform:scale(1); }}
-  100% {{ fill:{clr}; transform:scale(1); }}
-}}
-.{sid} {{ animation:d{sid} {CYCLE}s linear infinite; transform-origin:center; transform-box:fill-box; }}''')
+        levels = tuple(day["level"] for day in week)
+        css.append(frag(frag_column_css, ci, levels, COLS, col_hit.get(ci), MEGA_HIT, REBUILD_START, REBUILD_DUR))
 
     css.append('</style>')
     svg.append('\n'.join(css))
 
     # === BACKGROUND ===
-    svg.append(f'<rect width="{W}" height="{H}" rx="6" fill="{BG}"/>')
+    svg.append(f'<rect width="{W}" height="{H + MH}" rx="6" fill="{BG}"/>')
 
     # === STARS ===
     random.seed(42)
+    stars = []
     for _ in range(45):
-        sx, sy = random.randint(2,W-2), random.randint(2,H-2)
+        sx, sy = random.randint(2,W-2), random.randint(2,H+MH-2)
         sr = random.uniform(.3,1.1); dur = random.uniform(1.5,4); dl = random.uniform(0,5)
-        svg.append(f'<circle cx="{sx}" cy="{sy}" r="{sr}" fill="{STAR_C}" opacity=".2" style="animation:tw {dur:.1f}s ease {dl:.1f}s infinite;"/>')
+        stars.append(f'<circle class="st" cx="{sx}" cy="{sy}" r="{sr}" style="--d:{dur:.1f}s;--l:{dl:.1f}s"/>')
+    svg.append(group(stars, "\n", fill=STAR_C))
 
     # === LABELS ===
-    for ml_item in get_month_labels(dates):
-        lx = ML + ml_item["col"] * STEP
-        svg.append(f'<text x="{lx}" y="{MT-8}" fill="{LABEL_C}" font-family="Segoe UI,Helvetica,Arial,sans-serif" font-size="9" opacity=".8">{ml_item["name"]}</text>')
-    for row_idx, label in WEEKDAY_LABELS.items():
-        ly = MT + row_idx * STEP + CELL * 0.8
-        svg.append(f'<text x="{ML-10}" y="{ly}" fill="{LABEL_C}" font-family="Segoe UI,Helvetica,Arial,sans-serif" font-size="9" text-anchor="end" opacity=".8">{label}</text>')
+    months = [f'<text x="{ML + m["col"] * STEP}" y="{MT-8}">{m["name"]}</text>' for m in get_month_labels(dates)]
+    wdays = [f'<text x="{ML-10}" y="{MT + ri * STEP + CELL * 0.8}">{label}</text>' for ri, label in WEEKDAY_LABELS.items()]
+    svg.append(group(months + [group(wdays, text_anchor="end")], "\n", **LABEL_G))
 
     # === GRID SQUARES ===
-    for ci, week in enumerate(grid):
-        for ri, day in enumerate(week):
-            x = ML + ci * STEP; y = MT + ri * STEP
-            sid = f"c{ci}r{ri}"; clr = LV[day["level"]]
-            svg.append(f'<rect class="{sid}" x="{x}" y="{y}" width="{CELL}" height="{CELL}" rx="2" fill="{clr}"/>')
+    svg.append(group((frag(frag_column_cells, ci, tuple(day["level"] for day in week)) for ci, week in enumerate(grid)), "\n", **CELL_G))
+
+    # === HISTORY STRIP (windowed mode) ===
+    if history:
+        svg.extend(history_strip(history, start, COLS, ML, MT + GH + MB - 6, GW))
 
     # === INDIVIDUAL SHOTS ===
-    for gi, grp in enumerate(groups):
-        cc = grp[len(grp)//2]; bx = ML + cc * STEP + CELL//2
-        svg.append(f'<line class="trail{gi}" x1="{bx}" y1="{SHIP_Y+14}" x2="{bx}" y2="{MT+GH//2}" stroke="{LASER_C}" stroke-width="2" opacity="0" filter="url(#boltglow)" stroke-linecap="round"/>')
-    for gi, grp in enumerate(groups):
-        cc = grp[len(grp)//2]; bx = ML + cc * STEP + CELL//2
-        svg.append(f'<circle class="bolt{gi}" cx="{bx}" cy="{SHIP_Y+12}" r="0" fill="{BOLT_C}" filter="url(#boltglow)" opacity="0"/>')
-    for gi, grp in enumerate(groups):
-        cc = grp[len(grp)//2]; ex = ML + cc * STEP + CELL//2
-        svg.append(f'<circle class="xpl{gi}" cx="{ex}" cy="{MT+GH//2}" r="0" fill="{BOOM_C2}" opacity="0" filter="url(#boomglow)"/>')
+    shot_x = [ML + grp[len(grp)//2] * STEP + CELL//2 for grp in groups]
+    svg.append(group((frag(frag_trail, gi, bx, SHIP_Y+14, MT+GH//2) for gi, bx in enumerate(shot_x)), "\n", **TRAIL_G))
+    svg.append(group((frag(frag_bolt, gi, bx, SHIP_Y+12) for gi, bx in enumerate(shot_x)), "\n", **BOLT_G))
+    svg.append(group((frag(frag_xpl, gi, ex, MT+GH//2) for gi, ex in enumerate(shot_x)), "\n", **XPL_G))
 
     # === MEGA LASER ===
     svg.append(f'<line class="megaBeam" x1="{gcx}" y1="{SHIP_Y+16}" x2="{gcx}" y2="{gcy}" stroke="{MEGA_C}" stroke-width="0" opacity="0" filter="url(#megaglow)" stroke-linecap="round"/>')
@@ -478,7 +600,7 @@ def build_svg(grid, dates):
     for idx, c in enumerate([MEGA_C, BOOM_C2, MEGA_C2]):
         svg.append(f'<circle class="megaBoom{idx}" cx="{gcx}" cy="{gcy}" r="0" fill="none" stroke="{c}" stroke-width="3" opacity="0" filter="url(#megaglow)"/>')
     svg.append(f'<circle class="shockwave" cx="{gcx}" cy="{gcy}" r="0" fill="none" stroke="{FLASH_C}" stroke-width="0" opacity="0" filter="url(#shockglow)"/>')
-    svg.append(f'<rect class="megaFlash" width="{W}" height="{H}" rx="6" fill="{FLASH_C}" opacity="0"/>')
+    svg.append(f'<rect class="megaFlash" width="{W}" height="{H + MH}" rx="6" fill="{FLASH_C}" opacity="0"/>')
 
     # === FLYING SAUCER ===
     svg.append(f'''
@@ -526,6 +648,45 @@ def build_svg(grid, dates):
     return '\n'.join(svg)
 
 
+def fragment_cache(username=None):
+    """FragmentCache at $FRAGMENT_CACHE, or None when caching is off. Each user
+    gets their own file (cache.json → cache.<user>.json), since a save keeps only
+    the fragments of that render."""
+    path = os.environ.get("FRAGMENT_CACHE")
+    if not path:
+        return None
+    if username:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{username}{ext}"
+    return FragmentCache(path, FRAGMENT_SALT)
+
+
+def window_config():
+    """(window, cycle) from SPACESHIP_WINDOW / WINDOW_CYCLE. Without an explicit
+    cycle, the window pans one stop per day, independent of how often runs happen."""
+    window = int(os.environ.get("SPACESHIP_WINDOW", WINDOW))
+    cycle = os.environ.get("WINDOW_CYCLE")
+    cycle = int(cycle) if cycle else date.today().toordinal()
+    return window, cycle
+
+
+@renderer("spaceship")
+def render_spaceship(cal):
+    # dark and light variants are currently the same artwork
+    if cal.get("snapshot"):
+        view = Snapshot.shared(cal["snapshot"]).user(cal["username"])
+        grid, dates = view.grid(), view.week_dates()
+    else:
+        grid, dates = grid_from_weeks(cal["weeks"]) if cal["weeks"] else demo_grid()
+    window, cycle = window_config()
+    cache = fragment_cache(cal["username"])
+    s = build_svg(grid, dates, window=window, cycle=cycle, cache=cache)
+    if cache:
+        cache.save()
+        print(f"   {cache}")
+    return {"github-spaceship-dark.svg": s, "github-spaceship.svg": s}
+
+
 def main():
     username = os.environ.get("GITHUB_USERNAME", "cjgpedroso-coder")
     token = os.environ.get("GITHUB_TOKEN", "")
@@ -551,7 +712,12 @@ def main():
         print("⚠️ WARNING: Using DEMO data!")
 
     print("🎨 Building spaceship v4 (Grand Finale)...")
-    s = build_svg(grid, dates)
+    window, cycle = window_config()
+    cache = fragment_cache(username)
+    s = build_svg(grid, dates, window=window, cycle=cycle, cache=cache)
+    if cache:
+        cache.save()
+        print(f"   {cache}")
 
     for name in ("github-spaceship-dark.svg", "github-spaceship.svg"):
         path = os.path.join(out, name)
@@ -5,10 +5,15 @@ Uses PAT to include private contributions.
 Outputs SVGs matching the original visual style.
 """
 
-import os, json, urllib.request
+import os
 from datetime import datetime, timedelta
 
-GITHUB_API = "https://api.github.com/graphql"
+from calendar_api import fetch_calendar
+from profiling import hook
+from registry import renderer
+from snapshot import Snapshot
+from team_store import TeamStore
+from stats_index import StatsIndex, WEEKDAY_NAMES
 
 # Colors matching the README theme
 BG = "#0D1117"
@@ -20,39 +25,19 @@ GRAY_LIGHT = "#9F9F9F"
 FIRE_COLOR = "#00E7FF"
 
 
+@hook("fetch_contributions")
 def fetch_contributions(username, token):
     """Fetch contribution data from GitHub GraphQL API."""
-    q = """query($u:String!){user(login:$u){
-        contributionsCollection{
-            contributionCalendar{
-                totalContributions
-                weeks{contributionDays{
-                    contributionCount date weekday
-                }}
-            }
-        }
-    }}"""
-    p = json.dumps({"query": q, "variables": {"u": username}}).encode()
-    req = urllib.request.Request(GITHUB_API, data=p, headers={
-        "Authorization": f"bearer {token}", "Content-Type": "application/json"})
-    with urllib.request.urlopen(req) as r:
-        data = json.loads(r.read().decode())
-    
-    cal = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]
-    total = cal["totalContributions"]
-    
-    # Flatten all days
-    days = []
-    for w in cal["weeks"]:
-        for d in w["contributionDays"]:
-            days.append({
-                "date": d["date"],
-                "count": d["contributionCount"]
-            })
-    
-    return total, days
+    total, weeks = fetch_calendar(username, token)
+    return total, flatten_days(weeks)
 
 
+def flatten_days(weeks):
+    """Flatten calendar weeks into a list of {"date", "count"} days."""
+    return [{"date": d["date"], "count": d["count"]} for w in weeks for d in w]
+
+
+@hook("calc_streaks")
 def calc_streaks(days):
     """Calculate current and longest streaks."""
     current_streak = 0
@@ -129,6 +114,7 @@ def fmt_date_range(start, end):
     return f"{fmt_date(start)} - {fmt_date(end)}"
 
 
+@hook("streak_svg")
 def generate_streak_svg(total, streaks, first_date):
     """Generate streak stats SVG matching the black-ice theme with green colors."""
     W, H = 495, 195
@@ -234,6 +220,163 @@ def generate_streak_svg(total, streaks, first_date):
     return svg
 
 
+@hook("summary_svg")
+def generate_summary_svg(index):
+    """Generate aggregate stats card (best week/month, averages, weekday) in the streak card theme."""
+    W, H = 495, 195
+
+    week_start, week_total = index.best_week()
+    month_key, month_total = index.best_month()
+    month_label = datetime(month_key[0], month_key[1], 1).strftime("%b %Y") if month_key else ""
+    weekday, _ = index.busiest_weekday()
+    yoy = index.yoy_delta()
+    if yoy is None:
+        last_label, last_value = "Top 10% Day", f"{index.percentile(90)}+"
+    else:
+        last_label, last_value = "vs Last Year", f"{yoy:+d}"
+
+    cells = [
+        (week_total, "Best Week", f"Week of {fmt_date(week_start)}"),
+        (month_total, "Best Month", month_label),
+        (f"{index.rolling_avg(7):.1f}", "7-Day Average", "per day"),
+        (f"{index.rolling_avg(30):.1f}", "30-Day Average", "per day"),
+        (weekday[:3], "Most Active Day", f"{index.weekday_active[WEEKDAY_NAMES.index(weekday)]} active days"),
+        (last_value, last_label, f"{fmt_date(index.first_date)} - Present"),
+    ]
+
+    blocks = []
+    for i, (value, label, sub) in enumerate(cells):
+        cx = 82.5 + (i % 3) * 165
+        cy = 20 + (i // 3) * 85
+        delay = 0.4 + i * 0.1
+        blocks.append(f'''
+        <g style="isolation: isolate">
+            <g transform="translate({cx}, {cy})">
+                <text x="0" y="26" stroke-width="0" text-anchor="middle" fill="{GREEN}" stroke="none" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="700" font-size="24px" style="opacity: 0; animation: fadein 0.5s linear forwards {delay:.1f}s">
+                    {value}
+                </text>
+            </g>
+            <g transform="translate({cx}, {cy + 28})">
+                <text x="0" y="20" stroke-width="0" text-anchor="middle" fill="{GREEN}" stroke="none" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="400" font-size="13px" style="opacity: 0; animation: fadein 0.5s linear forwards {delay + 0.1:.1f}s">
+                    {label}
+                </text>
+            </g>
+            <g transform="translate({cx}, {cy + 46})">
+                <text x="0" y="20" stroke-width="0" text-anchor="middle" fill="{GRAY_LIGHT}" stroke="none" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="400" font-size="11px" style="opacity: 0; animation: fadein 0.5s linear forwards {delay + 0.2:.1f}s">
+                    {sub}
+                </text>
+            </g>
+        </g>''')
+
+    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+        style="isolation: isolate" viewBox="0 0 {W} {H}" width="{W}px" height="{H}px" direction="ltr">
+    <style>
+        @keyframes fadein {{
+            0% {{ opacity: 0; }}
+            100% {{ opacity: 1; }}
+        }}
+    </style>
+    <defs>
+        <clipPath id="outer_rectangle">
+            <rect width="{W}" height="{H}" rx="4.5"/>
+        </clipPath>
+    </defs>
+    <g clip-path="url(#outer_rectangle)">
+        <g style="isolation: isolate">
+            <rect stroke="#000000" stroke-opacity="0" fill="{BG}" rx="4.5" x="0.5" y="0.5" width="494" height="194"/>
+        </g>
+        <g style="isolation: isolate">
+            <line x1="165" y1="20" x2="165" y2="175" vector-effect="non-scaling-stroke" stroke-width="1" stroke="{GRAY}" stroke-opacity="0.3" stroke-linejoin="miter" stroke-linecap="square" stroke-miterlimit="3"/>
+            <line x1="330" y1="20" x2="330" y2="175" vector-effect="non-scaling-stroke" stroke-width="1" stroke="{GRAY}" stroke-opacity="0.3" stroke-linejoin="miter" stroke-linecap="square" stroke-miterlimit="3"/>
+            <line x1="20" y1="97.5" x2="475" y2="97.5" vector-effect="non-scaling-stroke" stroke-width="1" stroke="{GRAY}" stroke-opacity="0.15" stroke-linejoin="miter" stroke-linecap="square" stroke-miterlimit="3"/>
+        </g>{"".join(blocks)}
+    </g>
+</svg>'''
+    return svg
+
+
+@hook("leaderboard_svg")
+def generate_leaderboard_svg(store, top=10, weeks=12, title="Team Leaderboard"):
+    """Generate team leaderboard SVG (streak ranking + weekly team totals) from a TeamStore."""
+    rows = store.top_streaks(top)
+    weekly = store.weekly_totals(weeks)
+    busiest = store.most_active_day()
+    weekday_totals = store.weekday_totals()
+
+    W = 495
+    ROW_H = 24
+    LIST_TOP = 62
+    CHART_TOP = LIST_TOP + max(len(rows), 1) * ROW_H + 24
+    CHART_H = 60
+    H = CHART_TOP + CHART_H + 50
+
+    # Ranking rows
+    lines = []
+    for i, (user, current, longest, total) in enumerate(rows):
+        y = LIST_TOP + i * ROW_H
+        delay = 0.4 + i * 0.05
+        color = GREEN if i < 3 else GRAY_LIGHT
+        lines.append(f'''
+        <g style="opacity: 0; animation: fadein 0.5s linear forwards {delay:.2f}s">
+            <text x="30" y="{y}" fill="{color}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="700" font-size="13px">{i + 1}</text>
+            <text x="58" y="{y}" fill="{WHITE}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="400" font-size="13px">{user}</text>
+            <text x="330" y="{y}" fill="{GREEN}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="700" font-size="13px" text-anchor="end">{current}</text>
+            <text x="400" y="{y}" fill="{GRAY_LIGHT}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="400" font-size="12px" text-anchor="end">{longest}</text>
+            <text x="465" y="{y}" fill="{GRAY_LIGHT}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="400" font-size="12px" text-anchor="end">{total}</text>
+        </g>''')
+    if not rows:
+        lines.append(f'<text x="{W/2}" y="{LIST_TOP}" fill="{GRAY}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-size="12px" text-anchor="middle">No team data yet</text>')
+
+    # Weekly team totals bar chart
+    bars = []
+    peak = max([t for _, t in weekly] + [1])
+    bar_w = (W - 60) / max(len(weekly), 1)
+    for i, (wk, t) in enumerate(weekly):
+        h = (t / peak) * CHART_H
+        x = 30 + i * bar_w
+        bars.append(f'<rect x="{x + 2:.1f}" y="{CHART_TOP + CHART_H - h:.1f}" width="{bar_w - 4:.1f}" height="{h:.1f}" rx="2" fill="{GREEN}" opacity="{0.45 + 0.55 * t / peak:.2f}"/>')
+
+    busiest_label = f"Busiest day: {fmt_date(busiest[0])} ({busiest[1]})" if busiest else ""
+    top_weekday = WEEKDAY_NAMES[max(range(7), key=lambda k: weekday_totals[k])] if any(weekday_totals) else ""
+    footer = " · ".join(p for p in (busiest_label, f"Most active weekday: {top_weekday}" if top_weekday else "") if p)
+
+    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+        style="isolation: isolate" viewBox="0 0 {W} {H}" width="{W}px" height="{H}px" direction="ltr">
+    <style>
+        @keyframes fadein {{
+            0% {{ opacity: 0; }}
+            100% {{ opacity: 1; }}
+        }}
+    </style>
+    <defs>
+        <clipPath id="outer_rectangle">
+            <rect width="{W}" height="{H}" rx="4.5"/>
+        </clipPath>
+    </defs>
+    <g clip-path="url(#outer_rectangle)">
+        <g style="isolation: isolate">
+            <rect stroke="#000000" stroke-opacity="0" fill="{BG}" rx="4.5" x="0.5" y="0.5" width="{W - 1}" height="{H - 1}"/>
+        </g>
+        <text x="{W/2}" y="28" fill="{GREEN}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-weight="700" font-size="16px" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.2s">{title}</text>
+        <g fill="{GRAY}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-size="11px" style="opacity: 0; animation: fadein 0.5s linear forwards 0.3s">
+            <text x="58" y="{LIST_TOP - 20}">Member</text>
+            <text x="330" y="{LIST_TOP - 20}" text-anchor="end">Streak</text>
+            <text x="400" y="{LIST_TOP - 20}" text-anchor="end">Longest</text>
+            <text x="465" y="{LIST_TOP - 20}" text-anchor="end">Total</text>
+        </g>
+        <line x1="30" y1="{LIST_TOP - 13}" x2="465" y2="{LIST_TOP - 13}" stroke="{GRAY}" stroke-opacity="0.3" stroke-width="1"/>{"".join(lines)}
+        <line x1="30" y1="{CHART_TOP - 12}" x2="465" y2="{CHART_TOP - 12}" stroke="{GRAY}" stroke-opacity="0.3" stroke-width="1"/>
+        <g style="opacity: 0; animation: fadein 0.8s linear forwards 0.9s">
+            {"".join(bars)}
+        </g>
+        <text x="30" y="{CHART_TOP + CHART_H + 18}" fill="{GRAY_LIGHT}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-size="11px">Team contributions per week (last {len(weekly)})</text>
+        <text x="{W/2}" y="{H - 12}" fill="{GRAY_LIGHT}" font-family="\'Segoe UI\', Ubuntu, sans-serif" font-size="11px" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 1.1s">{footer}</text>
+    </g>
+</svg>'''
+    return svg
+
+
+@hook("activity_svg")
 def generate_activity_graph_svg(days, username):
     """Generate contribution activity graph SVG matching the green theme."""
     # Get last 31 days of data
@@ -276,12 +419,12 @@ def generate_activity_graph_svg(days, username):
     area_polygon = " ".join(area_points)
     
     # Grid lines
-    grid_lines = []
+    grid_lines, y_labels = [], []
     for i in range(y_steps + 1):
         y_val = (i / y_steps) * y_max
         y_pos = PADDING_TOP + GRAPH_H - (y_val / y_max) * GRAPH_H
-        grid_lines.append(f'<line x1="{PADDING_LEFT}" y1="{y_pos:.1f}" x2="{W - PADDING_RIGHT}" y2="{y_pos:.1f}" stroke="{GRAY}" stroke-opacity="0.15" stroke-width="1"/>')
-        grid_lines.append(f'<text x="{PADDING_LEFT - 10}" y="{y_pos + 4:.1f}" fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="11" text-anchor="end">{int(y_val)}</text>')
+        grid_lines.append(f'<line x1="{PADDING_LEFT}" y1="{y_pos:.1f}" x2="{W - PADDING_RIGHT}" y2="{y_pos:.1f}"/>')
+        y_labels.append(f'<text x="{PADDING_LEFT - 10}" y="{y_pos + 4:.1f}">{int(y_val)}</text>')
     
     # X-axis labels (every ~5 days)
     x_labels = []
@@ -294,14 +437,13 @@ def generate_activity_graph_svg(days, username):
             label = d.strftime("%b %d").replace(" 0", " ")
         except:
             label = day["date"][-5:]
-        x_labels.append(f'<text x="{x:.1f}" y="{PADDING_TOP + GRAPH_H + 25}" fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="11" text-anchor="middle">{label}</text>')
+        x_labels.append(f'<text x="{x:.1f}" y="{PADDING_TOP + GRAPH_H + 25}">{label}</text>')
     
     # Dots
     dots = []
     for x, y, count, date in dot_positions:
-        r = "4" if count > 0 else "3"
-        opacity = "1" if count > 0 else "0.5"
-        dots.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r}" fill="{GREEN}" opacity="{opacity}"/>')
+        dots.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4"/>' if count > 0 else
+                    f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" opacity="0.5"/>')
     
     title = f"{username}'s Contribution Graph"
     
@@ -318,20 +460,20 @@ def generate_activity_graph_svg(days, username):
     </style>
     <rect width="{W}" height="{H}" rx="6" fill="{BG}"/>
     
-    <!-- Title -->
-    <text x="{W/2}" y="35" fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="14" font-weight="600" text-anchor="middle" style="opacity:0; animation: fadeIn 0.5s forwards 0.2s">{title}</text>
-    
-    <!-- Y-axis label -->
-    <text x="15" y="{PADDING_TOP + GRAPH_H/2}" fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="11" text-anchor="middle" transform="rotate(-90, 15, {PADDING_TOP + GRAPH_H/2})">Contributions</text>
-    
     <!-- Grid -->
-    {"".join(grid_lines)}
-    
-    <!-- X labels -->
-    {"".join(x_labels)}
+    <g stroke="{GRAY}" stroke-opacity="0.15" stroke-width="1">{"".join(grid_lines)}</g>
     
-    <!-- X-axis label -->
-    <text x="{W/2}" y="{H - 8}" fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="11" text-anchor="middle">Days</text>
+    <g fill="{GRAY}" font-family="\'Segoe UI\', sans-serif" font-size="11" text-anchor="middle">
+        <!-- Title -->
+        <text x="{W/2}" y="35" font-size="14" font-weight="600" style="opacity:0; animation: fadeIn 0.5s forwards 0.2s">{title}</text>
+        <!-- Axis labels -->
+        <text x="15" y="{PADDING_TOP + GRAPH_H/2}" transform="rotate(-90, 15, {PADDING_TOP + GRAPH_H/2})">Contributions</text>
+        <text x="{W/2}" y="{H - 8}">Days</text>
+        <!-- Y labels -->
+        <g text-anchor="end">{"".join(y_labels)}</g>
+        <!-- X labels -->
+        {"".join(x_labels)}
+    </g>
     
     <!-- Area fill -->
     <polygon points="{area_polygon}" fill="{GREEN}" opacity="0.1" style="opacity:0; animation: fadeIn 0.8s forwards 0.5s"/>
@@ -340,13 +482,62 @@ def generate_activity_graph_svg(days, username):
     <polyline points="{polyline}" fill="none" stroke="{GREEN}" stroke-width="2" stroke-linejoin="round" stroke-linecap="round" stroke-dasharray="2000" style="animation: drawLine 2s ease forwards"/>
     
     <!-- Dots -->
-    <g style="opacity:0; animation: fadeIn 0.5s forwards 1.5s">
+    <g fill="{GREEN}" style="opacity:0; animation: fadeIn 0.5s forwards 1.5s">
         {"".join(dots)}
     </g>
 </svg>'''
     return svg
 
 
+# --- Pipeline renderers (see pipeline.py); stats cards need real data ---
+
+def calendar_days(cal):
+    """Days for a pipeline calendar: a zero-copy snapshot view when the pipeline
+    wrote one, else the fetched weeks. None when there is no real data."""
+    if cal.get("snapshot"):
+        return Snapshot.shared(cal["snapshot"]).user(cal["username"]).days()
+    return flatten_days(cal["weeks"]) if cal["weeks"] else None
+
+
+@renderer("streak")
+def render_streak(cal):
+    days = calendar_days(cal)
+    if not days:
+        return {}
+    streaks = calc_streaks(days)
+    first_date = days[0]["date"] if days else ""
+    return {"streak-stats.svg": generate_streak_svg(cal["total"], streaks, first_date)}
+
+
+@renderer("activity")
+def render_activity(cal):
+    days = calendar_days(cal)
+    if not days:
+        return {}
+    return {"activity-graph.svg": generate_activity_graph_svg(days, cal["username"])}
+
+
+@renderer("summary")
+def render_summary(cal):
+    if cal.get("snapshot"):
+        view = Snapshot.shared(cal["snapshot"]).user(cal["username"])
+        return {"summary-stats.svg": generate_summary_svg(StatsIndex.from_counts(view.start, view.counts))}
+    days = calendar_days(cal)
+    if not days:
+        return {}
+    return {"summary-stats.svg": generate_summary_svg(StatsIndex(days))}
+
+
+@renderer("leaderboard")
+def render_leaderboard(cal):
+    # Team card only when a TeamStore is configured; it never touches the API
+    path = os.environ.get("TEAM_DB")
+    if not path or not os.path.exists(path):
+        return {}
+    with TeamStore(path) as store:
+        return {"team-leaderboard.svg": generate_leaderboard_svg(store)}
+
+
 def main():
     username = os.environ.get("GITHUB_USERNAME", "cjgpedroso-coder")
     token = os.environ.get("GITHUB_TOKEN", "")
@@ -388,6 +579,27 @@ def main():
         f.write(graph_svg)
     print(f"✅ {graph_path} ({len(graph_svg):,}b)")
 
+    # Generate Summary Stats SVG
+    print("📐 Generating summary stats...")
+    index = StatsIndex(days)
+    summary_svg = generate_summary_svg(index)
+    summary_path = os.path.join(out, "summary-stats.svg")
+    with open(summary_path, "w") as f:
+        f.write(summary_svg)
+    print(f"✅ {summary_path} ({len(summary_svg):,}b)")
+
+    # Generate Team Leaderboard SVG (only with a team history store)
+    team_db = os.environ.get("TEAM_DB")
+    if team_db:
+        print("👥 Generating team leaderboard...")
+        with TeamStore(team_db) as store:
+            store.upsert(username, ((d["date"], d["count"]) for d in days))
+            board_svg = generate_leaderboard_svg(store)
+        board_path = os.path.join(out, "team-leaderboard.svg")
+        with open(board_path, "w") as f:
+            f.write(board_svg)
+        print(f"✅ {board_path} ({len(board_svg):,}b)")
+
     print("🚀 Stats generation complete!")
 
 
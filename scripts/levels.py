@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🟩 Local Contribution Levels
+Derives GitHub-style quartile levels (0-4) from raw daily counts, so cached,
+merged or synthetic calendars get the same colors without asking the API
+for `contributionLevel`.
+Quartiles are taken over the non-zero days with quickselect (expected O(n))
+instead of a full sort.
+"""
+
+import random
+
+
+def _select(vals, k):
+    """k-th smallest (0-based) of vals via iterative quickselect. Reorders vals."""
+    lo, hi = 0, len(vals) - 1
+    rnd = random.Random(len(vals))
+    while lo < hi:
+        pivot = vals[rnd.randint(lo, hi)]
+        # three-way partition of vals[lo..hi]
+        lt, i, gt = lo, lo, hi
+        while i <= gt:
+            v = vals[i]
+            if v < pivot:
+                vals[lt], vals[i] = v, vals[lt]; lt += 1; i += 1
+            elif v > pivot:
+                vals[gt], vals[i] = v, vals[gt]; gt -= 1
+            else:
+                i += 1
+        if k < lt: hi = lt - 1
+        elif k > gt: lo = gt + 1
+        else: return pivot
+    return vals[k]
+
+
+def quartile_thresholds(counts):
+    """Nearest-rank Q1/Q2/Q3 of the non-zero counts; (0, 0, 0) for an empty calendar."""
+    active = [c for c in counts if c > 0]
+    m = len(active)
+    if not m:
+        return 0, 0, 0
+    # -(-a // b) is ceil division; ranks are 1-based
+    ranks = [max(1, -(-m * q // 4)) - 1 for q in (1, 2, 3)]
+    return tuple(_select(active, k) for k in ranks)
+
+
+def level_of(c, thresholds):
+    q1, q2, q3 = thresholds
+    if c <= 0: return 0
+    if c <= q1: return 1
+    if c <= q2: return 2
+    if c <= q3: return 3
+    return 4
+
+
+def compute_levels(counts):
+    """Map each count to its 0-4 level using quartiles of this calendar."""
+    counts = list(counts)
+    t = quartile_thresholds(counts)
+    return [level_of(c, t) for c in counts]
+
+
+def apply_levels(grid):
+    """Fill `level` on every day of a week-major grid from its counts, in place."""
+    t = quartile_thresholds(d["count"] for w in grid for d in w)
+    for w in grid:
+        for d in w:
+            d["level"] = level_of(d["count"], t)
+    return grid
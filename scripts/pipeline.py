@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+🛠️ Artifact Pipeline — one entry point for every card
+    PYTHONPATH=scripts python -m pipeline [--workers N] [--only NAME ...] [--profile DIR]
+                                          [--skip-unchanged DIR]
+
+Builds a small task graph and runs it on a process pool:
+    fetch → {spaceship, streak, activity, summary, …} → manifest
+Render tasks come from the @renderer registry, so new cards join the graph
+just by being registered in one of the PLUGINS modules (or PIPELINE_PLUGINS).
+
+With --skip-unchanged (or CALENDAR_DIGESTS) the calendar's digest is kept in
+DIR/<user>.sha1 and a run whose calendar hasn't changed renders nothing. A
+calendar already fetched by the refresh scheduler arrives packed in
+CALENDAR_PAYLOAD (the dispatch's client_payload) and is not fetched again.
+Under Actions, `changed=true|false` is written to $GITHUB_OUTPUT.
+"""
+
+import argparse, hashlib, importlib, json, os, tempfile, time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+
+import profiling
+from calendar_api import calendar_digest, fetch_calendar, unpack_calendar
+from registry import RENDERERS
+from snapshot import Snapshot, write_snapshot
+from team_store import TeamStore
+
+PLUGINS = ("generate_spaceship", "generate_stats")
+
+
+class Task:
+    def __init__(self, name, fn, deps=(), args=()):
+        self.name, self.fn, self.deps, self.args = name, fn, tuple(deps), tuple(args)
+
+
+class _Inline:
+    """Executor stand-in for --workers 1: runs tasks in-process, in order."""
+    def submit(self, fn, *args):
+        f = Future()
+        try:
+            f.set_result(fn(*args))
+        except Exception as e:
+            f.set_exception(e)
+        return f
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+def run_graph(tasks, pool):
+    """Run tasks as soon as their deps finish. Each fn gets (*args, *dep_results).
+    Returns ({name: result}, {name: error}); a failed task fails everything downstream."""
+    by_name = {t.name: t for t in tasks}
+    results, errors, running = {}, {}, {}
+    pending = list(tasks)
+    while pending or running:
+        for t in list(pending):
+            if any(d in errors for d in t.deps):
+                errors[t.name] = RuntimeError(f"upstream failed: {t.deps}")
+                pending.remove(t)
+            elif all(d in results for d in t.deps):
+                running[pool.submit(t.fn, *t.args, *(results[d] for d in t.deps))] = t.name
+                pending.remove(t)
+        if not running:
+            if pending:
+                raise RuntimeError(f"unsatisfiable deps: {[t.name for t in pending]}")
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for f in done:
+            name = running.pop(f)
+            try:
+                results[name] = f.result()
+            except Exception as e:
+                errors[name] = e
+                print(f"❌ {name}: {e}")
+    missing = set(by_name) - set(results) - set(errors)
+    assert not missing, missing
+    return results, errors
+
+
+# --- Task bodies (module-level so they pickle into worker processes) ---
+
+def fetch_task(username, token, snap_path=None, prefetched=None):
+    """Fetch the calendar (or take a prefetched (total, weeks)). With snap_path,
+    write it as a binary snapshot and hand workers only the path, so each maps
+    it instead of unpickling the weeks."""
+    cal = {"username": username, "total": 0, "weeks": None}
+    if prefetched:
+        cal["total"], cal["weeks"] = prefetched
+    elif not token:
+        print("⚠️ No GITHUB_TOKEN — demo mode (stats cards skipped)")
+        return cal
+    else:
+        print(f"🚀 Fetching {username}...")
+        try:
+            cal["total"], cal["weeks"] = fetch_calendar(username, token)
+            print(f"✅ {len(cal['weeks'])} weeks, {cal['total']} contributions")
+        except Exception as e:
+            print(f"❌ API ERROR: {e}")
+            return cal
+    if os.environ.get("TEAM_DB"):
+        with TeamStore(os.environ["TEAM_DB"]) as store:
+            store.upsert_calendar(username, cal["weeks"])
+    if snap_path:
+        write_snapshot(snap_path, {username: cal.pop("weeks")})
+        cal["weeks"], cal["snapshot"] = None, snap_path
+    return cal
+
+
+def render_task(name, fn, out, cal):
+    t0 = time.perf_counter()
+    files = fn(cal)
+    artifacts = []
+    for fname, text in files.items():
+        path = os.path.join(out, fname)
+        with open(path, "w") as f: f.write(text)
+        data = text.encode()
+        artifacts.append({"file": fname, "renderer": name, "bytes": len(data),
+                          "sha256": hashlib.sha256(data).hexdigest()})
+        print(f"✅ {path} ({len(data):,}b)")
+    dt = time.perf_counter() - t0
+    for a in artifacts:
+        a["seconds"] = round(dt, 3)
+    return artifacts
+
+
+def manifest_task(out, username, *render_results):
+    manifest = {
+        "username": username,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "artifacts": [a for r in render_results for a in r],
+    }
+    path = os.path.join(out, "manifest.json")
+    with open(path, "w") as f: json.dump(manifest, f, indent=2)
+    print(f"✅ {path} ({len(manifest['artifacts'])} artifacts)")
+    return manifest
+
+
+def load_plugins():
+    extra = [m for m in os.environ.get("PIPELINE_PLUGINS", "").split(",") if m]
+    for mod in (*PLUGINS, *extra):
+        importlib.import_module(mod)
+
+
+def build_graph(username, token, out, only=None, snap_path=None, prefetched=None):
+    names = [n for n in RENDERERS if not only or n in only]
+    tasks = [Task("fetch", fetch_task, args=(username, token, snap_path, prefetched))]
+    # pass the function itself: it pickles by reference, so workers import its module
+    tasks += [Task(n, render_task, deps=("fetch",), args=(n, RENDERERS[n], out)) for n in names]
+    tasks.append(Task("manifest", manifest_task, deps=names, args=(out, username)))
+    return tasks
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="pipeline", description="Render every card in one run.")
+    ap.add_argument("--user", default=os.environ.get("GITHUB_USERNAME", "cjgpedroso-coder"))
+    ap.add_argument("--out", default=os.environ.get("OUTPUT_DIR", "dist"))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--only", nargs="*", help="renderer names to run (default: all)")
+    ap.add_argument("--profile", metavar="DIR", help="write per-phase profiles to DIR (see profiling.py)")
+    ap.add_argument("--skip-unchanged", metavar="DIR", default=os.environ.get("CALENDAR_DIGESTS"),
+                    help="skip rendering when the calendar's digest in DIR is unchanged")
+    args = ap.parse_args(argv)
+    if args.profile: profiling.enable(args.profile)
+    token = os.environ.get("GITHUB_TOKEN", "")
+    prefetched = _payload_calendar(args.user)
+    digest_path = os.path.join(args.skip_unchanged, f"{args.user}.sha1") if args.skip_unchanged else None
+    if digest_path and (prefetched or token):
+        if not prefetched:
+            try:
+                prefetched = fetch_calendar(args.user, token)
+            except Exception as e:
+                print(f"❌ API ERROR: {e}")
+                return 1
+        digest = calendar_digest(prefetched[1])
+        if _read(digest_path) == digest:
+            print(f"💤 {args.user}: calendar unchanged, nothing to render")
+            _set_output(changed="false")
+            return 0
+    _, errors = run(args.user, token, args.out, args.workers, args.only, prefetched)
+    if digest_path and prefetched and not errors:
+        os.makedirs(args.skip_unchanged, exist_ok=True)
+        with open(digest_path, "w") as f: f.write(digest)
+    _set_output(changed="true")
+    return 1 if errors else 0
+
+
+def _payload_calendar(username):
+    """(total, weeks) packed into CALENDAR_PAYLOAD for this user, else None."""
+    try:
+        payload = json.loads(os.environ.get("CALENDAR_PAYLOAD") or "null")
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("user") != username or "counts" not in payload:
+        return None
+    print(f"📦 {username}: calendar from dispatch payload ({len(payload['counts'])} days)")
+    return unpack_calendar(payload)
+
+
+def _read(path):
+    try:
+        with open(path) as f: return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _set_output(**kw):
+    if os.environ.get("GITHUB_OUTPUT"):
+        with open(os.environ["GITHUB_OUTPUT"], "a") as f:
+            f.writelines(f"{k}={v}\n" for k, v in kw.items())
+
+
+def run(username, token, out, workers=1, only=None, prefetched=None):
+    """Run the whole graph for one user. Returns (results, errors) by task name."""
+    os.makedirs(out, exist_ok=True)
+    load_plugins()
+    t0 = time.perf_counter()
+    pool = _Inline() if workers <= 1 else ProcessPoolExecutor(max_workers=workers)
+    with tempfile.TemporaryDirectory() as work, pool:
+        snap_path = os.path.join(work, "calendar.snap")
+        tasks = build_graph(username, token, out, only, snap_path, prefetched)
+        print(f"🛠️ {len(tasks)} tasks: {' → '.join(t.name for t in tasks)} ({workers} workers)")
+        results, errors = run_graph(tasks, pool)
+        Snapshot.drop_shared(snap_path)
+    print(f"{'❌' if errors else '🚀'} Pipeline finished in {time.perf_counter() - t0:.2f}s")
+    return results, errors
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
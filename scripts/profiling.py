@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+🔬 Render Profiler — opt-in hooks around the render hot paths
+Functions decorated with @hook("phase") are returned untouched unless
+profiling is on, so disabled hooks cost nothing. Turn them on with
+SPACESHIP_PROFILE=<dir> (read at import, and inherited by worker processes)
+or profiling.enable(dir) (what `pipeline --profile` and
+`refresh_scheduler serve --profile` call). Each hooked call then writes:
+    <phase>.<pid>.<n>.pstats     cProfile of the outermost phase on the thread
+    <phase>.<pid>.<n>.alloc.txt  tracemalloc top-N allocation growth of the phase
+    stacks.<pid>.collapsed       sampled stacks rooted at [phase] frames, for
+                                 flamegraph.pl / speedscope / inferno
+Nested phases (group_targets inside build_svg) get their own allocation report
+and appear as [phase] frames in the outer one's stacks. Under tracemalloc the
+timings are inflated; compare phases against each other, not with clean runs.
+tracemalloc is process-wide, so phases running concurrently on other threads
+(refresh_scheduler jobs) show up in each other's allocation reports.
+
+    SPACESHIP_PROFILE=prof python scripts/generate_spaceship.py
+    flamegraph.pl prof/stacks.*.collapsed > flame.svg
+"""
+
+import cProfile, functools, os, sys, threading, time, tracemalloc
+from collections import Counter
+from itertools import count
+
+ENV = "SPACESHIP_PROFILE"
+TOP = int(os.environ.get("SPACESHIP_PROFILE_TOP", 15))  # lines per allocation report
+INTERVAL = 0.002                                         # stack sampling period (s)
+
+_HOOKS = []                  # (phase, original fn) for every hooked function
+_active = {}                 # thread id -> stack of active phase names
+_busy = set()                # thread ids inside profiler bookkeeping (not sampled)
+_stacks = Counter()          # collapsed stack -> samples
+_calls = count(1)
+_lock = threading.Lock()
+_tracing = 0                 # threads currently holding tracemalloc on
+_sampler_pid = None
+_local = threading.local()
+
+
+def hook(phase):
+    """Mark a function as a profiling phase (no-op unless profiling is enabled)."""
+    def deco(fn):
+        _HOOKS.append((phase, fn))
+        return _wrap(phase, fn) if os.environ.get(ENV) else fn
+    return deco
+
+
+def enable(out_dir):
+    """Turn profiling on for this process and any workers it starts."""
+    os.makedirs(out_dir, exist_ok=True)
+    os.environ[ENV] = os.path.abspath(out_dir)
+    # hooks already applied as no-ops: rebind every module global that holds
+    # the original, so `from x import fn` copies are profiled too
+    for phase, fn in _HOOKS:
+        wrapped = None
+        for mod in list(sys.modules.values()):
+            d = getattr(mod, "__dict__", None) or {}
+            for name, value in list(d.items()):
+                if value is fn:
+                    wrapped = wrapped or _wrap(phase, fn)
+                    d[name] = wrapped
+    print(f"🔬 Profiling {len(_HOOKS)} hooks → {os.environ[ENV]}")
+
+
+def _wrap(phase, fn):
+    if hasattr(fn, "__profiled__"):
+        return fn
+    @functools.wraps(fn)
+    def profiled(*args, **kwargs):
+        return _run(phase, fn, args, kwargs)
+    profiled.__profiled__ = fn
+    return profiled
+
+
+def _run(phase, fn, args, kwargs):
+    global _tracing
+    out = os.environ.get(ENV)
+    if not out:
+        return fn(*args, **kwargs)
+    _start_sampler()
+    tid = threading.get_ident()
+    stack = _active.setdefault(tid, [])
+    outer = not stack
+    stack.append(phase); _busy.add(tid)
+    if outer:
+        os.makedirs(out, exist_ok=True)
+        with _lock:
+            if not tracemalloc.is_tracing(): tracemalloc.start()
+            _tracing += 1
+    parent = getattr(_local, "prof", None)
+    before = _snapshot(parent)
+    prof = None
+    if outer:
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            prof = None  # another profiler is active (3.12+ allows one per process)
+        _local.prof = prof
+    _busy.discard(tid)
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        dt = time.perf_counter() - t0
+        _busy.add(tid)
+        if prof: prof.disable()
+        after = _snapshot(parent)
+        n = next(_calls)
+        base = os.path.join(out, f"{phase}.{os.getpid()}.{n}")
+        if prof: prof.dump_stats(base + ".pstats")
+        grew = _alloc_report(base + ".alloc.txt", phase, dt, before, after)
+        print(f"🔬 {phase} {dt:.3f}s, {grew / 1024:+.1f} KiB → {base}.*")
+        if outer:
+            _local.prof = None
+            with _lock:
+                _tracing -= 1
+                if not _tracing: tracemalloc.stop()
+            _flush_stacks(out)
+        stack.pop()
+        if stack: _busy.discard(tid)
+
+
+def _snapshot(parent):
+    """tracemalloc snapshot, with the enclosing phase's cProfile paused around it."""
+    if parent: parent.disable()
+    snap = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+    if parent: parent.enable()
+    return snap
+
+
+def _alloc_report(path, phase, dt, before, after):
+    stats = after.compare_to(before, "lineno")
+    grew = sum(s.size_diff for s in stats)
+    lines = [f"# {phase}  pid {os.getpid()}  {dt:.3f}s  net {grew / 1024:+.1f} KiB"]
+    for s in stats[:TOP]:
+        fr = s.traceback[0]
+        lines.append(f"{s.size_diff / 1024:+10.1f} KiB {s.count_diff:+8d} blocks  {fr.filename}:{fr.lineno}")
+    with open(path, "w") as f: f.write("\n".join(lines) + "\n")
+    return grew
+
+
+# --- Stack sampling ---
+
+def _start_sampler():
+    """One daemon sampler per process (forked workers start their own)."""
+    global _sampler_pid
+    if _sampler_pid == os.getpid():
+        return
+    with _lock:
+        if _sampler_pid == os.getpid():
+            return
+        if _sampler_pid is not None:   # forked: the parent's phases aren't ours
+            _active.clear(); _busy.clear(); _stacks.clear()
+        _sampler_pid = os.getpid()
+        threading.Thread(target=_sample_loop, name="profiling-sampler", daemon=True).start()
+
+
+def _sample_loop():
+    while True:
+        time.sleep(INTERVAL)
+        frames = sys._current_frames()
+        for tid, phases in list(_active.items()):
+            f = frames.get(tid)
+            if f is None or not phases or tid in _busy: continue
+            chain = []
+            while f is not None:
+                chain.append(f.f_code); f = f.f_back
+            chain.reverse()
+            runs = [i for i, c in enumerate(chain) if c is _run.__code__]
+            if not runs: continue
+            names, k = [], 0
+            for c in chain[runs[0]:]:
+                if c is _run.__code__:
+                    names.append(f"[{phases[k] if k < len(phases) else '?'}]"); k += 1
+                elif c.co_filename != __file__:
+                    names.append(f"{c.co_name} ({os.path.basename(c.co_filename)}:{c.co_firstlineno})")
+            _stacks[";".join(names)] += 1
+
+
+def _flush_stacks(out):
+    """Rewrite this process's collapsed-stack file (cumulative over its phases)."""
+    lines = [f"{stack} {n}" for stack, n in sorted(dict(_stacks).items())]
+    path = os.path.join(out, f"stacks.{os.getpid()}.collapsed")
+    with open(f"{path}.tmp", "w") as f: f.write("\n".join(lines) + "\n")
+    os.replace(f"{path}.tmp", path)
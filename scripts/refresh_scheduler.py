@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+⏱️ Refresh Scheduler — debounced, budgeted on-demand regeneration
+Instead of regenerating everything on a blind timer, users are refreshed when
+something asks for it. Triggers arrive from:
+  - the CLI:        python scripts/refresh_scheduler.py trigger alice bob
+  - a file drop:    touch .refresh/alice.trigger
+  - local HTTP:     curl -X POST localhost:8787/refresh/alice
+Bursts per user are debounced and coalesced into one run; users whose
+calendars changed recently go first; runs are capped by a worker pool and a
+token-bucket API budget. A run fetches once and only re-renders when the
+calendar actually changed — locally, or with --dispatch OWNER/REPO by sending
+the `refresh` repository_dispatch that spaceship.yml listens for, with the
+fetched calendar packed into the payload so the workflow doesn't fetch again.
+
+    python scripts/refresh_scheduler.py serve --port 8787 --debounce 60 --budget 100/3600
+    python scripts/refresh_scheduler.py serve --dispatch owner/repo   # token needs repo scope
+"""
+
+import argparse, heapq, json, os, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import profiling
+from calendar_api import calendar_digest, fetch_calendar, pack_calendar
+
+DROP_SUFFIX = ".trigger"
+
+
+class TokenBucket:
+    """`calls` API calls per `per` seconds, refilled continuously."""
+
+    def __init__(self, calls, per, clock=time.monotonic):
+        self.capacity, self.rate, self.clock = calls, calls / per, clock
+        self.tokens, self.stamp = float(calls), clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self):
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RefreshScheduler:
+    """Debounce/coalesce triggers per user and run `job(user) -> changed` on a pool.
+
+    A user becomes due `debounce` seconds after its latest trigger, but never
+    later than `max_wait` after its first pending one, so a steady trickle of
+    triggers cannot starve it. A user triggered while running is re-queued
+    once the run finishes.
+    """
+
+    def __init__(self, job, debounce=60.0, max_wait=600.0, concurrency=2,
+                 budget=(100, 3600), clock=time.monotonic):
+        self.job, self.debounce, self.max_wait, self.clock = job, debounce, max_wait, clock
+        self.bucket = TokenBucket(*budget, clock=clock)
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.concurrency = concurrency
+        self.lock = threading.Lock()
+        self.wake = threading.Event()   # set on triggers and finished runs
+        self.pending = {}        # user -> [first trigger, last trigger, trigger count]
+        self.running = set()
+        self.last_changed = {}   # user -> clock time its calendar last changed
+        self.stats = {"triggers": 0, "runs": 0, "changed": 0, "api_calls": 0}
+
+    def trigger(self, user, source="cli"):
+        now = self.clock()
+        with self.lock:
+            self.stats["triggers"] += 1
+            p = self.pending.get(user)
+            if p: p[1] = now; p[2] += 1
+            else: self.pending[user] = [now, now, 1]
+        self.wake.set()
+        print(f"📥 {user} ({source})")
+
+    def _due(self, now):
+        """Due users, most recently changed first, then oldest due time."""
+        heap = []
+        for user, (first, last, _) in self.pending.items():
+            due = min(last + self.debounce, first + self.max_wait)
+            if due <= now and user not in self.running:
+                heapq.heappush(heap, (-self.last_changed.get(user, float("-inf")), due, user))
+        return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+    def tick(self):
+        """Start as many due runs as concurrency and API budget allow."""
+        started = []
+        with self.lock:
+            for user in self._due(self.clock()):
+                if len(self.running) >= self.concurrency or not self.bucket.take():
+                    break
+                n = self.pending.pop(user)[2]
+                self.running.add(user)
+                self.stats["api_calls"] += 1
+                started.append((user, n))
+        for user, n in started:
+            print(f"🔄 {user}" + (f" ({n} triggers coalesced)" if n > 1 else ""))
+            self.pool.submit(self._run, user)
+        return len(started)
+
+    def _run(self, user):
+        try:
+            changed = self.job(user)
+        except Exception as e:
+            print(f"❌ {user}: {e}")
+            changed = False
+        with self.lock:
+            self.running.discard(user)
+            self.stats["runs"] += 1
+            if changed:
+                self.stats["changed"] += 1
+                self.last_changed[user] = self.clock()
+        self.wake.set()
+
+    def next_wake(self):
+        """Seconds until a tick could start something, capped at 1s so the drop
+        dir keeps being polled. Runs held back by the pool wait for a finished
+        run (see wait()); runs held back by the budget, for the next token."""
+        with self.lock:
+            now = self.clock()
+            due = [min(l + self.debounce, f + self.max_wait)
+                   for user, (f, l, _) in self.pending.items() if user not in self.running]
+            if not due:
+                return 1.0
+            if min(due) > now:
+                return max(0.05, min(1.0, min(due) - now))
+            if len(self.running) >= self.concurrency:
+                return 1.0
+            return max(0.05, min(1.0, self.bucket.wait_time()))
+
+    def wait(self, timeout):
+        """Sleep up to `timeout`, waking early on a trigger or a finished run."""
+        self.wake.wait(timeout)
+        self.wake.clear()
+
+    def status(self):
+        with self.lock:
+            return {**self.stats, "pending": sorted(self.pending), "running": sorted(self.running),
+                    "tokens": round(self.bucket.tokens, 2)}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+
+# --- Jobs: fetch once, publish only when the calendar changed ---
+
+class RenderJob:
+    """Render the user's cards locally into <out>/<user>."""
+
+    def __init__(self, token, out, workers=1):
+        self.token, self.out, self.workers = token, out, workers
+        self.digests = {}
+
+    def __call__(self, user):
+        total, weeks = fetch_calendar(user, self.token)
+        digest = calendar_digest(weeks)
+        if self.digests.get(user) == digest:
+            print(f"💤 {user} unchanged, render skipped")
+            return False
+        ok = self.publish(user, total, weeks)
+        if ok:
+            self.digests[user] = digest
+        return ok
+
+    def publish(self, user, total, weeks):
+        import pipeline
+        _, errors = pipeline.run(user, self.token, os.path.join(self.out, user), self.workers,
+                                 prefetched=(total, weeks))
+        return not errors
+
+
+class DispatchJob(RenderJob):
+    """Ask the repo's workflow to rebuild: POST a `refresh` repository_dispatch
+    carrying the user and their packed calendar (see pipeline's CALENDAR_PAYLOAD)."""
+
+    def __init__(self, token, repo, event="refresh"):
+        super().__init__(token, None)
+        self.url, self.event = f"https://api.github.com/repos/{repo}/dispatches", event
+
+    def publish(self, user, total, weeks):
+        payload = {"user": user, **pack_calendar(total, weeks)}
+        body = json.dumps({"event_type": self.event, "client_payload": payload}).encode()
+        req = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "Authorization": f"bearer {self.token}", "Accept": "application/vnd.github+json"})
+        with urllib.request.urlopen(req) as r:
+            print(f"📡 {user}: dispatched {self.event} ({r.status})")
+        return True
+
+
+# --- Trigger sources ---
+
+def scan_drop_dir(sched, drop_dir):
+    """Trigger every `<user>.trigger` file in drop_dir and remove it."""
+    for name in os.listdir(drop_dir):
+        if name.endswith(DROP_SUFFIX):
+            try:
+                os.remove(os.path.join(drop_dir, name))
+            except FileNotFoundError:
+                continue
+            sched.trigger(name[:-len(DROP_SUFFIX)], "file")
+
+
+def make_handler(sched):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            parts = self.path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "refresh" and parts[1]:
+                sched.trigger(parts[1], "http")
+                return self._reply(202, {"queued": parts[1]})
+            self._reply(404, {"error": "POST /refresh/<user>"})
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/status":
+                return self._reply(200, sched.status())
+            self._reply(404, {"error": "GET /status"})
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+def serve(sched, drop_dir, port):
+    os.makedirs(drop_dir, exist_ok=True)
+    httpd = None
+    if port:
+        httpd = ThreadingHTTPServer(("127.0.0.1", port), make_handler(sched))
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        print(f"🌐 Listening on http://127.0.0.1:{port}/refresh/<user>")
+    print(f"📂 Watching {drop_dir}/<user>{DROP_SUFFIX}")
+    try:
+        while True:
+            scan_drop_dir(sched, drop_dir)
+            sched.tick()
+            sched.wait(sched.next_wake())
+    except KeyboardInterrupt:
+        print("👋 Stopping scheduler")
+    finally:
+        if httpd: httpd.shutdown()
+        sched.shutdown()
+
+
+def _budget(s):
+    calls, per = s.split("/")
+    return int(calls), float(per)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="refresh_scheduler", description="Debounced on-demand card refresh.")
+    ap.add_argument("--drop-dir", default=os.environ.get("REFRESH_DROP_DIR", ".refresh"))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    tp = sub.add_parser("trigger", help="queue users for refresh (via the drop dir)")
+    tp.add_argument("users", nargs="+")
+    sp = sub.add_parser("serve", help="run the scheduler")
+    sp.add_argument("--port", type=int, default=8787, help="HTTP trigger port (0 disables)")
+    sp.add_argument("--out", default=os.environ.get("OUTPUT_DIR", "dist"))
+    sp.add_argument("--dispatch", metavar="OWNER/REPO", help="send a repository_dispatch instead of rendering locally")
+    sp.add_argument("--debounce", type=float, default=60.0, help="quiet seconds before a run")
+    sp.add_argument("--max-wait", type=float, default=600.0, help="max seconds a trigger waits")
+    sp.add_argument("--concurrency", type=int, default=2)
+    sp.add_argument("--budget", type=_budget, default=(100, 3600.0), help="API calls per seconds, e.g. 100/3600")
+    sp.add_argument("--workers", type=int, default=1, help="render workers per run")
+    sp.add_argument("--profile", metavar="DIR", help="write per-phase profiles to DIR (see profiling.py)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "trigger":
+        os.makedirs(args.drop_dir, exist_ok=True)
+        for user in args.users:
+            open(os.path.join(args.drop_dir, user + DROP_SUFFIX), "w").close()
+            print(f"📥 {user} queued")
+        return 0
+
+    token = os.environ.get("GITHUB_TOKEN", "")
+    if not token:
+        print("❌ No GITHUB_TOKEN — cannot refresh")
+        return 1
+    if args.profile: profiling.enable(args.profile)
+    job = DispatchJob(token, args.dispatch) if args.dispatch else RenderJob(token, args.out, args.workers)
+    sched = RefreshScheduler(job, args.debounce, args.max_wait, args.concurrency, args.budget)
+    serve(sched, args.drop_dir, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+🧩 Renderer Registry
+Cards register here with @renderer and join the pipeline graph automatically.
+A renderer takes the fetched calendar context and returns {filename: text};
+returning {} skips the artifact (e.g. no real data for a stats card).
+"""
+
+RENDERERS = {}
+
+
+def renderer(name):
+    """Register fn(cal) -> {filename: text} under `name`."""
+    def deco(fn):
+        RENDERERS[name] = fn
+        return fn
+    return deco
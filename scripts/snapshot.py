@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+💾 Binary Calendar Snapshot — mmap-able, shared zero-copy across workers
+Many users' calendars in one file that render workers map read-only and read
+through memoryview slices, instead of each re-parsing JSON into dicts.
+
+Layout (little-endian):
+    header  <4sHHIQQQ  magic "CSNP", version, reserved, n_users,
+                       names offset, counts offset, levels offset
+    index   n_users × <IHHIII  name offset, name length, reserved,
+                               first day (date ordinal), day offset, n_days
+    names   UTF-8 user names, back to back
+    counts  uint32 per day, all users contiguous (4-byte aligned)
+    levels  uint8 per day, same order as counts
+Days are dense and daily from each user's first day.
+"""
+
+import mmap, os, struct, sys
+from collections.abc import Sequence
+from datetime import date
+
+from levels import compute_levels
+
+MAGIC = b"CSNP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQQ")
+ENTRY = struct.Struct("<IHHIII")
+
+
+def write_snapshot(path, calendars):
+    """Write {username: weeks} (weeks as returned by fetch_calendar) to `path`.
+    Levels are computed per user from the counts."""
+    names, entries, counts, levels = b"", [], [], bytearray()
+    for user, weeks in calendars.items():
+        days = [d for w in weeks for d in w]
+        first = date.fromisoformat(days[0]["date"]).toordinal() if days else 0
+        dense = [0] * (date.fromisoformat(days[-1]["date"]).toordinal() - first + 1 if days else 0)
+        for d in days:
+            dense[date.fromisoformat(d["date"]).toordinal() - first] = d["count"]
+        raw = user.encode()
+        entries.append(ENTRY.pack(len(names), len(raw), 0, first, len(counts), len(dense)))
+        names += raw
+        counts.extend(dense)
+        levels.extend(compute_levels(dense))
+    names_off = HEADER.size + ENTRY.size * len(entries)
+    counts_off = (names_off + len(names) + 3) & ~3
+    levels_off = counts_off + 4 * len(counts)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(entries), names_off, counts_off, levels_off))
+        f.write(b"".join(entries))
+        f.write(names)
+        f.write(b"\0" * (counts_off - names_off - len(names)))
+        f.write(struct.pack(f"<{len(counts)}I", *counts))
+        f.write(levels)
+    os.replace(tmp, path)
+    return path
+
+
+class Snapshot:
+    """Read-only mmap of a snapshot file. Views stay valid until close()."""
+
+    _shared = {}
+
+    @classmethod
+    def shared(cls, path):
+        """One mapping per path per process, reused by every render task."""
+        snap = cls._shared.get(path)
+        if snap is None:
+            snap = cls._shared[path] = cls(path)
+        return snap
+
+    @classmethod
+    def drop_shared(cls, path):
+        """Close the shared mapping for `path` (long-running processes call this per run)."""
+        snap = cls._shared.pop(path, None)
+        if snap is not None:
+            try:
+                snap.close()
+            except BufferError:
+                pass  # a view is still referenced; the mapping goes when it does
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self._mm)
+        magic, ver, _, n, names_off, counts_off, levels_off = HEADER.unpack_from(self.buf)
+        if magic != MAGIC or ver != VERSION:
+            raise ValueError(f"not a v{VERSION} calendar snapshot: {path}")
+        self.index = {}
+        for i in range(n):
+            noff, nlen, _, first, off, ndays = ENTRY.unpack_from(self.buf, HEADER.size + i * ENTRY.size)
+            name = bytes(self.buf[names_off + noff:names_off + noff + nlen]).decode()
+            self.index[name] = (first, off, ndays)
+        counts = self.buf[counts_off:levels_off]
+        # the file is little-endian; native casts are zero-copy only on LE hosts
+        self._counts = counts.cast("I") if sys.byteorder == "little" else _swapped(counts)
+        self._levels = self.buf[levels_off:]
+
+    def users(self):
+        return list(self.index)
+
+    def user(self, name):
+        first, off, n = self.index[name]
+        return CalendarView(name, first, self._counts[off:off + n], self._levels[off:off + n])
+
+    def close(self):
+        self._counts.release(); self._levels.release(); self.buf.release()
+        self._mm.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+def _swapped(mv):
+    import array
+    a = array.array("I", bytes(mv)); a.byteswap()
+    return memoryview(a)
+
+
+class CalendarView:
+    """One user's slice of a snapshot: `counts`/`levels` are memoryviews, and
+    days()/grid() expose the shapes the stats and spaceship renderers expect."""
+
+    def __init__(self, name, first, counts, levels):
+        self.name, self.first, self.counts, self.levels = name, first, counts, levels
+
+    @property
+    def start(self):
+        return date.fromordinal(self.first) if self.first else date.today()
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def days(self):
+        return DaysView(self)
+
+    def grid(self):
+        return GridView(self)
+
+    def week_dates(self):
+        """First date of each grid column, like fetch_contributions()."""
+        g = GridView(self)
+        return [date.fromordinal(self.first + max(0, ci * 7 - g.lead)).isoformat() for ci in range(len(g))]
+
+
+class DaysView(Sequence):
+    """Lazy [{"date", "count"}, …] over a CalendarView."""
+
+    def __init__(self, view):
+        self.v = view
+
+    def __len__(self):
+        return len(self.v.counts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        return {"date": date.fromordinal(self.v.first + i).isoformat(), "count": self.v.counts[i]}
+
+
+class GridView(Sequence):
+    """Lazy week-major grid (columns of 7 {"level", "count"} days, Sunday first)
+    over a CalendarView; slicing returns another view, not a copy."""
+
+    def __init__(self, view, lo=0, hi=None):
+        self.v = view
+        # Sunday=0 offset of the first day, so column 0 may start mid-week
+        self.lead = (date.fromordinal(view.first).weekday() + 1) % 7 if view.first else 0
+        ncols = (self.lead + len(view.counts) + 6) // 7
+        self.lo, self.hi = lo, ncols if hi is None else hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __getitem__(self, ci):
+        if isinstance(ci, slice):
+            lo, hi, step = ci.indices(len(self))
+            assert step == 1, "grid views only support contiguous slices"
+            return GridView(self.v, self.lo + lo, self.lo + max(lo, hi))
+        if ci < 0: ci += len(self)
+        if not 0 <= ci < len(self): raise IndexError(ci)
+        base = (self.lo + ci) * 7 - self.lead
+        n, counts, levels = len(self.v.counts), self.v.counts, self.v.levels
+        return [{"level": levels[i], "count": counts[i]} if 0 <= i < n else {"level": 0, "count": 0}
+                for i in range(base, base + 7)]
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+📐 Contribution Stats Index
+Precomputed prefix sums + weekday/month accumulators over a contribution
+calendar, so range sums, rolling averages and aggregate stats are O(1)
+lookups instead of a fresh scan over `days` per stat.
+Uses NumPy when installed, pure Python otherwise.
+"""
+
+import math
+from datetime import date
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+WEEKDAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def _ordinal(d):
+    if isinstance(d, int):
+        return d
+    return d.toordinal() if isinstance(d, date) else date.fromisoformat(d).toordinal()
+
+
+class StatsIndex:
+    """Dense day-indexed view of a calendar with precomputed accumulators.
+
+    Index 0 is the first calendar day; missing days inside the span count as 0.
+    """
+
+    def __init__(self, days):
+        dated = sorted((_ordinal(d["date"]), d["count"]) for d in days)
+        if not dated:
+            self._build(date.today().toordinal(), [])
+            return
+        start = dated[0][0]
+        counts = [0] * (dated[-1][0] - start + 1)
+        for o, c in dated:
+            counts[o - start] += c
+        self._build(start, counts)
+
+    @classmethod
+    def from_counts(cls, start_date, counts):
+        """Build from a dense count sequence (list, array or memoryview) starting at start_date."""
+        idx = cls.__new__(cls)
+        idx._build(_ordinal(start_date), counts)
+        return idx
+
+    def _build(self, start, counts):
+        self.start = start
+        self.n = n = len(counts)
+        # date.weekday() is Mon=0; GitHub calendars are Sun=0
+        wd0 = (date.fromordinal(start).weekday() + 1) % 7
+        if np is not None:
+            arr = np.asarray(counts, dtype=np.int64)
+            self.counts = arr
+            self.prefix = np.concatenate(([0], np.cumsum(arr)))
+            wds = (np.arange(n) + wd0) % 7
+            self.weekday_totals = np.bincount(wds, weights=arr, minlength=7).astype(np.int64).tolist()
+            self.weekday_active = np.bincount(wds, weights=arr > 0, minlength=7).astype(np.int64).tolist()
+            self.sorted_counts = np.sort(arr)
+        else:
+            self.counts = list(counts)
+            self.prefix = [0, *accumulate(self.counts)]
+            self.weekday_totals = [0] * 7
+            self.weekday_active = [0] * 7
+            for i, c in enumerate(self.counts):
+                wd = (i + wd0) % 7
+                self.weekday_totals[wd] += c
+                self.weekday_active[wd] += c > 0
+            self.sorted_counts = sorted(self.counts)
+
+        # Month accumulators: (year, month) -> total, filled by walking month boundaries
+        self.month_totals = {}
+        if n:
+            d = date.fromordinal(start)
+            end = start + n
+            while d.toordinal() < end:
+                nxt = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+                lo = d.toordinal() - start
+                hi = min(nxt.toordinal(), end) - start
+                self.month_totals[(d.year, d.month)] = int(self.prefix[hi] - self.prefix[lo])
+                d = nxt
+
+    # --- O(1) queries ---
+
+    def _clamp(self, d):
+        return max(0, min(self.n, _ordinal(d) - self.start))
+
+    @property
+    def first_date(self):
+        return date.fromordinal(self.start).isoformat() if self.n else ""
+
+    @property
+    def last_date(self):
+        return date.fromordinal(self.start + self.n - 1).isoformat() if self.n else ""
+
+    @property
+    def total(self):
+        return int(self.prefix[self.n])
+
+    def range_sum(self, start, end):
+        """Total contributions for the inclusive date range [start, end]."""
+        lo = self._clamp(start)
+        hi = self._clamp(_ordinal(end) + 1)
+        return int(self.prefix[hi] - self.prefix[lo]) if hi > lo else 0
+
+    def rolling_avg(self, window, end=None):
+        """Mean daily contributions over the `window` days ending at `end` (default: last day)."""
+        hi = self.n if end is None else self._clamp(_ordinal(end) + 1)
+        lo = max(0, hi - window)
+        return (self.prefix[hi] - self.prefix[lo]) / window if window > 0 else 0.0
+
+    def percentile(self, p):
+        """Nearest-rank percentile of daily counts (p in 0..100)."""
+        if not self.n:
+            return 0
+        k = min(self.n - 1, max(0, math.ceil(p / 100 * self.n) - 1))
+        return int(self.sorted_counts[k])
+
+    def yoy_delta(self, end=None):
+        """Last 365 days vs the 365 days before; None when history is too short."""
+        hi = self.n if end is None else self._clamp(_ordinal(end) + 1)
+        if hi < 730:
+            return None
+        cur = self.prefix[hi] - self.prefix[hi - 365]
+        prev = self.prefix[hi - 365] - self.prefix[hi - 730]
+        return int(cur - prev)
+
+    # --- Aggregates (O(n/7) or O(months), from the accumulators) ---
+
+    def best_week(self):
+        """Best Sunday-aligned calendar week as (start_date, total)."""
+        if not self.n:
+            return "", 0
+        lead = (6 - date.fromordinal(self.start).weekday()) % 7  # days until first Sunday
+        bounds = [0] + list(range(lead, self.n, 7)) + [self.n]
+        bounds = sorted(set(bounds))
+        best_i, best = 0, -1
+        for a, b in zip(bounds, bounds[1:]):
+            s = self.prefix[b] - self.prefix[a]
+            if s > best:
+                best_i, best = a, s
+        return date.fromordinal(self.start + best_i).isoformat(), int(best)
+
+    def best_month(self):
+        """Best calendar month as ((year, month), total)."""
+        if not self.month_totals:
+            return None, 0
+        key = max(self.month_totals, key=self.month_totals.get)
+        return key, self.month_totals[key]
+
+    def busiest_weekday(self):
+        """Weekday name with the most contributions, Sunday-first like the calendar."""
+        i = max(range(7), key=lambda k: self.weekday_totals[k])
+        return WEEKDAY_NAMES[i], int(self.weekday_totals[i])
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+🧩 SVG Emission Helpers — shared shapes and hoisted attributes
+Repeated geometry is defined once (`<defs>`) and placed with `<use>`, and
+inherited presentation attributes common to a run of siblings (fill, stroke,
+font, fill-opacity, …) are written once on a parent `<g>` instead of on
+every child. Fewer attributes per node means smaller files and less for the
+renderer to parse and cascade. Non-inherited ones (`filter`, `opacity`,
+`clip-path`) apply to the composited group on a `<g>`, so they stay on the
+elements.
+
+Keyword names map to SVG attributes: `font_family` → `font-family`, and a
+trailing underscore is dropped (`class_` → `class`).
+"""
+
+
+def attrs(**kw):
+    """Render keyword arguments as ` name="value"` pairs, skipping None."""
+    return "".join(f' {k.rstrip("_").replace("_", "-")}="{v}"' for k, v in kw.items() if v is not None)
+
+
+def group(children, sep="", **kw):
+    """Wrap children in a `<g>` carrying the attributes they share (empty → "")."""
+    children = list(children)
+    if not children:
+        return ""
+    return f"<g{attrs(**kw)}>{sep}{sep.join(children)}{sep}</g>"
+
+
+def use(ref, **kw):
+    """`<use>` of a shape defined once under `<defs>` with id=ref."""
+    return f'<use href="#{ref}"{attrs(**kw)}/>'
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+👥 Team History Store — SQLite per-user per-day counts
+Bulk upserts from fetched calendars, streak summaries maintained on insert,
+and indexed queries behind the team leaderboard card (generate_stats.py).
+
+    python scripts/team_store.py --db team.db sync alice bob carol   # needs GITHUB_TOKEN
+    python scripts/team_store.py --db team.db top
+
+Days are stored as date ordinals: `day % 7` is the weekday with Sunday = 0,
+and `day - day % 7` is the Sunday that starts its calendar week.
+"""
+
+import argparse, os, sqlite3
+from datetime import date
+
+from calendar_api import fetch_calendar
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contributions (
+    user  TEXT    NOT NULL,
+    day   INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    run   INTEGER NOT NULL,          -- length of the active-day run ending on this day
+    PRIMARY KEY (user, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS contributions_day ON contributions(day, count);
+CREATE INDEX IF NOT EXISTS contributions_run ON contributions(user, run);
+
+CREATE TABLE IF NOT EXISTS streaks (
+    user     TEXT PRIMARY KEY,
+    current  INTEGER NOT NULL,
+    longest  INTEGER NOT NULL,
+    last_day INTEGER NOT NULL,
+    total    INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS streaks_current ON streaks(current DESC, longest DESC);
+CREATE INDEX IF NOT EXISTS streaks_longest ON streaks(longest DESC);
+"""
+
+
+class TeamStore:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    # --- Writes ---
+
+    def upsert(self, user, days):
+        """Insert or update (date, count) pairs for one user and refresh its streaks.
+
+        Only rows from the earliest changed day onward are revisited, and the
+        walk stops once the recomputed runs match what is already stored, so
+        re-importing an overlapping calendar costs O(changed days).
+        """
+        new = {}
+        for d, c in days:
+            new[d.toordinal() if isinstance(d, date) else date.fromisoformat(d).toordinal()] = c
+        if not new:
+            return 0
+        cur = self.db.cursor()
+        lo = min(new)
+        stored = dict(cur.execute(
+            "SELECT day, count FROM contributions WHERE user=? AND day>=? ORDER BY day", (user, lo)))
+        changed = sorted(d for d, c in new.items() if stored.get(d) != c)
+        if not changed:
+            return 0
+        start = changed[0]
+        row = cur.execute("SELECT run FROM contributions WHERE user=? AND day=?", (user, start - 1)).fetchone()
+        run = row[0] if row else 0
+        prev_runs = dict(cur.execute(
+            "SELECT day, run FROM contributions WHERE user=? AND day>=?", (user, start)))
+
+        rows, delta, last_changed = [], 0, changed[-1]
+        prev_day = start - 1
+        for d in sorted(set(stored) | set(new)):
+            if d < start:
+                continue
+            c = new.get(d, stored.get(d))
+            run = (run + 1 if d == prev_day + 1 else 1) if c > 0 else 0
+            prev_day = d
+            if d in new and stored.get(d) != c:
+                delta += c - stored.get(d, 0)
+                rows.append((user, d, c, run))
+            elif prev_runs.get(d) != run:
+                rows.append((user, d, c, run))
+            elif d > last_changed:
+                break            # runs have converged; later rows are unchanged
+        cur.executemany(
+            "INSERT INTO contributions(user, day, count, run) VALUES (?,?,?,?) "
+            "ON CONFLICT(user, day) DO UPDATE SET count=excluded.count, run=excluded.run", rows)
+        self._refresh_streak(user, delta)
+        self.db.commit()
+        return len(rows)
+
+    def upsert_calendar(self, user, weeks):
+        """Bulk upsert a calendar as returned by fetch_calendar()."""
+        return self.upsert(user, ((d["date"], d["count"]) for w in weeks for d in w))
+
+    def _refresh_streak(self, user, delta):
+        cur = self.db.cursor()
+        last_day, current = cur.execute(
+            "SELECT day, run FROM contributions WHERE user=? ORDER BY day DESC LIMIT 1", (user,)).fetchone()
+        longest = cur.execute("SELECT MAX(run) FROM contributions WHERE user=?", (user,)).fetchone()[0]
+        row = cur.execute("SELECT total FROM streaks WHERE user=?", (user,)).fetchone()
+        total = (row[0] if row else 0) + delta
+        cur.execute("INSERT OR REPLACE INTO streaks(user, current, longest, last_day, total) VALUES (?,?,?,?,?)",
+                    (user, current, longest, last_day, total))
+
+    # --- Queries ---
+
+    def top_streaks(self, n=10, by="current"):
+        """[(user, current, longest, total), …] best first. `current` only counts
+        for users synced up to the team's latest day (or the day before); a
+        streak frozen at an old sync is reported as 0."""
+        order = "cur DESC, longest DESC" if by == "current" else "longest DESC, cur DESC"
+        return self.db.execute(
+            "SELECT user, CASE WHEN last_day >= (SELECT MAX(last_day) FROM streaks) - 1 THEN current ELSE 0 END AS cur,"
+            f" longest, total FROM streaks ORDER BY {order}, user LIMIT ?", (n,)).fetchall()
+
+    def weekly_totals(self, weeks=12, end=None):
+        """[(week start date, team total), …] for the last `weeks` calendar weeks."""
+        end = end or self._last_day()
+        if end is None:
+            return []
+        first = end - end % 7 - 7 * (weeks - 1)
+        rows = dict(self.db.execute(
+            "SELECT day - day % 7 AS wk, SUM(count) FROM contributions WHERE day>=? AND day<=? GROUP BY wk",
+            (first, end)))
+        return [(date.fromordinal(w).isoformat(), rows.get(w, 0)) for w in range(first, end - end % 7 + 1, 7)]
+
+    def most_active_day(self, days=365, end=None):
+        """(date, team total) of the busiest single day in the window, or None."""
+        end = end or self._last_day()
+        if end is None:
+            return None
+        row = self.db.execute(
+            "SELECT day, SUM(count) AS s FROM contributions WHERE day>? AND day<=? GROUP BY day ORDER BY s DESC LIMIT 1",
+            (end - days, end)).fetchone()
+        return (date.fromordinal(row[0]).isoformat(), row[1]) if row else None
+
+    def weekday_totals(self, days=365, end=None):
+        """Team totals per weekday, Sunday first."""
+        end = end or self._last_day()
+        out = [0] * 7
+        if end is None:
+            return out
+        for wd, s in self.db.execute(
+                "SELECT day % 7, SUM(count) FROM contributions WHERE day>? AND day<=? GROUP BY day % 7",
+                (end - days, end)):
+            out[wd] = s
+        return out
+
+    def user_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM streaks").fetchone()[0]
+
+    def _last_day(self):
+        return self.db.execute("SELECT MAX(last_day) FROM streaks").fetchone()[0]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="team_store", description="Team contribution history store.")
+    ap.add_argument("--db", default=os.environ.get("TEAM_DB", "team.db"))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("sync", help="fetch users' calendars and upsert them")
+    sp.add_argument("users", nargs="+")
+    tp = sub.add_parser("top", help="print the streak leaderboard")
+    tp.add_argument("-n", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    with TeamStore(args.db) as store:
+        if args.cmd == "sync":
+            token = os.environ.get("GITHUB_TOKEN", "")
+            if not token:
+                print("❌ No GITHUB_TOKEN — cannot sync")
+                return 1
+            for user in args.users:
+                try:
+                    _, weeks = fetch_calendar(user, token)
+                except Exception as e:
+                    print(f"❌ {user}: {e}")
+                    continue
+                print(f"✅ {user}: {store.upsert_calendar(user, weeks)} rows changed")
+        else:
+            for i, (user, current, longest, total) in enumerate(store.top_streaks(args.n), 1):
+                print(f"{i:>3}. {user:<24} 🔥{current:<4} longest {longest:<4} total {total}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+🎞️ Timeline Sampler — headless CSS animation evaluation for generated SVGs
+Parses the `@keyframes` / `animation` rules emitted by build_svg() and the
+stats cards, and computes each animated element's properties (fill, opacity,
+transform, r, cy, stroke-width, …) at any time t, without a browser.
+
+    python scripts/timeline.py dist/github-spaceship.svg --at 14.9 15.2
+    python scripts/timeline.py old.svg --diff new.svg          # equivalence check
+    python scripts/timeline.py dist/github-spaceship.svg --at 15 --snapshot frame.svg
+"""
+
+import argparse, math, re, sys
+import xml.etree.ElementTree as ET
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+NAMED_COLORS = {"white": (255, 255, 255), "black": (0, 0, 0), "red": (255, 0, 0)}
+TIMING = {
+    "linear": None,
+    "ease": (.25, .1, .25, 1), "ease-in": (.42, 0, 1, 1),
+    "ease-out": (0, 0, .58, 1), "ease-in-out": (.42, 0, .58, 1),
+    "step-start": ("steps", 1, "start"), "step-end": ("steps", 1, "end"),
+}
+FILL_MODES = {"none", "forwards", "backwards", "both"}
+DIRECTIONS = {"normal", "reverse", "alternate", "alternate-reverse"}
+
+
+# === CSS PARSING ===
+
+def _blocks(css):
+    """Yield (prelude, body) for each top-level `prelude { body }` block."""
+    i, n = 0, len(css)
+    while i < n:
+        j = css.find("{", i)
+        if j < 0: return
+        depth, k = 1, j + 1
+        while k < n and depth:
+            depth += {"{": 1, "}": -1}.get(css[k], 0); k += 1
+        yield css[i:j].strip(), css[j+1:k-1]
+        i = k
+
+
+def _decls(body):
+    out = {}
+    for part in body.split(";"):
+        if ":" in part:
+            k, v = part.split(":", 1)
+            out[k.strip()] = v.strip()
+    return out
+
+
+def _offset(sel):
+    sel = sel.strip()
+    if sel == "from": return 0.0
+    if sel == "to": return 1.0
+    return float(sel.rstrip("%")) / 100
+
+
+def parse_css(css):
+    """Return (keyframes, rules): keyframes[name] = [(offset, {prop: value}), …]
+    sorted by offset; rules[class] = {prop: value} for simple `.class` selectors."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    keyframes, rules = {}, {}
+    for prelude, body in _blocks(css):
+        if prelude.startswith("@keyframes"):
+            name = prelude.split(None, 1)[1].strip()
+            frames = []
+            for sel, decl in _blocks(body):
+                d = _decls(decl)
+                frames.extend((_offset(s), d) for s in sel.split(","))
+            keyframes[name] = sorted(frames, key=lambda f: f[0])
+        else:
+            for sel in prelude.split(","):
+                sel = sel.strip()
+                if re.fullmatch(r"\.[\w-]+", sel):
+                    rules.setdefault(sel[1:], {}).update(_decls(body))
+    return keyframes, rules
+
+
+def _split_top(s, sep=","):
+    """Split on `sep` outside parentheses."""
+    out, depth, cur = [], 0, ""
+    for ch in s:
+        depth += (ch == "(") - (ch == ")")
+        if ch == sep and not depth:
+            out.append(cur); cur = ""
+        else:
+            cur += ch
+    out.append(cur)
+    return [p.strip() for p in out if p.strip()]
+
+
+def parse_animation(value, keyframes):
+    """Parse an `animation` shorthand into a list of dicts."""
+    anims = []
+    for spec in _split_top(value):
+        a = {"name": None, "duration": 0.0, "delay": 0.0, "timing": TIMING["ease"],
+             "iterations": 1.0, "fill": "none", "direction": "normal"}
+        times = []
+        for tok in re.findall(r"[\w.-]+\([^)]*\)|\S+", spec):
+            m = re.fullmatch(r"(-?[\d.]+)(ms|s)", tok)
+            if m:
+                times.append(float(m.group(1)) / (1000 if m.group(2) == "ms" else 1))
+            elif tok in TIMING:
+                a["timing"] = TIMING[tok]
+            elif tok.startswith("steps("):
+                n, *pos = [p.strip() for p in tok[6:-1].split(",")]
+                a["timing"] = ("steps", int(n), (pos or ["end"])[0].replace("jump-", ""))
+            elif tok.startswith("cubic-bezier("):
+                a["timing"] = tuple(float(p) for p in tok[13:-1].split(","))
+            elif tok == "infinite":
+                a["iterations"] = math.inf
+            elif re.fullmatch(r"[\d.]+", tok):
+                a["iterations"] = float(tok)
+            elif tok in FILL_MODES:
+                a["fill"] = tok
+            elif tok in DIRECTIONS:
+                a["direction"] = tok
+            elif tok in keyframes or a["name"] is None:
+                a["name"] = tok
+        if times: a["duration"] = times[0]
+        if len(times) > 1: a["delay"] = times[1]
+        if a["name"] and a["name"] != "none":
+            anims.append(a)
+    return anims
+
+
+# === VALUES ===
+
+def _bezier(p1x, p1y, p2x, p2y, x):
+    def coord(t, a, b): return 3*a*t*(1-t)**2 + 3*b*t*t*(1-t) + t**3
+    lo, hi = 0.0, 1.0
+    for _ in range(40):
+        mid = (lo + hi) / 2
+        if coord(mid, p1x, p2x) < x: lo = mid
+        else: hi = mid
+    return coord((lo + hi) / 2, p1y, p2y)
+
+
+def ease(timing, f):
+    if timing is None: return f
+    if timing[0] == "steps":
+        _, n, pos = timing
+        return (math.ceil(f * n) if pos == "start" else math.floor(f * n)) / n if f < 1 else 1.0
+    return _bezier(*timing, f)
+
+
+def _color(v):
+    v = v.strip().lower()
+    if v in NAMED_COLORS: return NAMED_COLORS[v]
+    m = re.fullmatch(r"#([0-9a-f]{3}|[0-9a-f]{6})", v)
+    if not m: return None
+    h = m.group(1)
+    if len(h) == 3: h = "".join(c * 2 for c in h)
+    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+
+
+def _num(v):
+    m = re.fullmatch(r"(-?[\d.]+(?:e-?\d+)?)(px|deg|%)?", v.strip())
+    return (float(m.group(1)), m.group(2) or "") if m else None
+
+
+def _transform(v):
+    fns = re.findall(r"([\w]+)\(([^)]*)\)", v)
+    if not fns: return None
+    out = []
+    for name, args in fns:
+        nums = [_num(a) for a in re.split(r"[,\s]+", args.strip()) if a]
+        if any(n is None for n in nums): return None
+        out.append((name, nums))
+    return out
+
+
+def _fmt_num(x):
+    return f"{x:.4g}"
+
+
+def interpolate(a, b, f):
+    """Interpolate two CSS values; non-interpolable pairs switch at f = 0.5."""
+    if a == b or f <= 0: return a
+    if f >= 1: return b
+    ca, cb = _color(a), _color(b)
+    if ca and cb:
+        return "#" + "".join(f"{round(x + (y - x) * f):02x}" for x, y in zip(ca, cb))
+    na, nb = _num(a), _num(b)
+    if na and nb and (na[1] == nb[1] or not na[0] or not nb[0]):
+        return _fmt_num(na[0] + (nb[0] - na[0]) * f) + (na[1] or nb[1])
+    ta, tb = _transform(a), _transform(b)
+    if ta and tb and [t[0] for t in ta] == [t[0] for t in tb]:
+        parts = []
+        for (name, xs), (_, ys) in zip(ta, tb):
+            if len(xs) != len(ys): break
+            args = ", ".join(_fmt_num(x[0] + (y[0] - x[0]) * f) + (x[1] or y[1]) for x, y in zip(xs, ys))
+            parts.append(f"{name}({args})")
+        else:
+            return " ".join(parts)
+    return a if f < .5 else b
+
+
+def normalize(v):
+    """Canonical form for comparisons: lowercase hex colors, trimmed numbers."""
+    if v is None: return None
+    c = _color(v)
+    if c: return "#" + "".join(f"{x:02x}" for x in c)
+    n = _num(v)
+    if n: return _fmt_num(n[0]) + n[1]
+    t = _transform(v)
+    if t: return " ".join(f"{k}({', '.join(_fmt_num(x[0]) + x[1] for x in xs)})" for k, xs in t)
+    return v.strip()
+
+
+# === SAMPLING ===
+
+def _progress(a, t):
+    """(iteration progress 0..1, or None when the animation has no effect at t)."""
+    dur, tl = a["duration"], t - a["delay"]
+    if tl < 0:
+        return 0.0 if a["fill"] in ("backwards", "both") else None
+    if dur <= 0:
+        return 1.0 if a["fill"] in ("forwards", "both") else None
+    if tl >= dur * a["iterations"]:
+        if a["fill"] not in ("forwards", "both"): return None
+        it = a["iterations"]
+        p = it - math.floor(it) or 1.0
+        n = math.ceil(it) - 1
+    else:
+        n, r = divmod(tl, dur)
+        p = r / dur
+    d = a["direction"]
+    if d == "reverse" or (d == "alternate" and n % 2) or (d == "alternate-reverse" and not n % 2):
+        p = 1 - p
+    return p
+
+
+def _value_at(frames, prop, p, base, timing):
+    merged = {}
+    for o, d in frames:             # keyframes sharing an offset: the later one wins
+        if prop in d: merged[o] = d[prop]
+    if not merged: return None
+    stops = sorted(merged.items())
+    if stops[0][0] > 0: stops.insert(0, (0.0, base if base is not None else stops[0][1]))
+    if stops[-1][0] < 1: stops.append((1.0, base if base is not None else stops[-1][1]))
+    for (o1, v1), (o2, v2) in zip(stops, stops[1:]):
+        if o1 <= p <= o2:
+            f = (p - o1) / (o2 - o1) if o2 > o1 else 1.0
+            return interpolate(v1, v2, ease(timing, f))
+    return stops[-1][1]
+
+
+class Timeline:
+    """Animated elements of one SVG, sampleable at arbitrary times."""
+
+    def __init__(self, svg_text):
+        self.root = ET.fromstring(svg_text)
+        css = "\n".join(el.text or "" for el in self.root.iter() if _tag(el) == "style")
+        self.keyframes, self.rules = parse_css(css)
+        self.elements = []   # (key, element, animations, base values)
+        seen, counters, class_uses = {}, {}, {}
+        for el in self.root.iter():
+            for c in el.get("class", "").split()[:1]:
+                class_uses[c] = class_uses.get(c, 0) + 1
+        for el in self.root.iter():
+            tag = _tag(el)
+            counters[tag] = counters.get(tag, 0) + 1
+            style = _decls(el.get("style", ""))
+            classes = el.get("class", "").split()
+            anims = []
+            for c in classes:
+                if "animation" in self.rules.get(c, {}):
+                    anims += parse_animation(_vars(self.rules[c]["animation"], style), self.keyframes)
+            if "animation" in style:
+                anims = parse_animation(style["animation"], self.keyframes)  # inline wins
+            if not anims:
+                continue
+            # keys must survive refactors of the markup: ids and one-off classes
+            # name an element; anything else is identified by tag + position
+            key = el.get("id") or (classes[0] if classes and class_uses[classes[0]] == 1 else None) \
+                or _geom_key(tag, el) or f"{tag}#{counters[tag] - 1}"
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1: key = f"{key}[{seen[key] - 1}]"
+            base = {k: v for k, v in el.attrib.items() if ":" not in k}
+            base.update({k: v for k, v in style.items() if k != "animation"})
+            self.elements.append((key, el, anims, base))
+
+    def props(self):
+        """All property names any animation touches."""
+        return sorted({p for frames in self.keyframes.values() for _, d in frames for p in d})
+
+    def state(self, el_anims, base, t):
+        out = {}
+        for a in el_anims:          # later animations override earlier ones
+            frames = self.keyframes.get(a["name"])
+            p = _progress(a, t) if frames else None
+            if p is None: continue
+            for prop in {k for _, d in frames for k in d}:
+                v = _value_at(frames, prop, p, base.get(prop), a["timing"])
+                if v is not None: out[prop] = v
+        return out
+
+    def sample(self, t):
+        """{element key: {prop: value}} at time t (seconds)."""
+        return {key: self.state(anims, base, t) for key, _, anims, base in self.elements}
+
+    def snapshot(self, t):
+        """Static SVG frame at time t: animations off, sampled values inlined."""
+        root = ET.fromstring(ET.tostring(self.root))
+        by_pos = {i: el for i, el in enumerate(root.iter())}
+        index = {id(el): i for i, el in enumerate(self.root.iter())}
+        for key, el, anims, base in self.elements:
+            dst = by_pos[index[id(el)]]
+            st = self.state(anims, base, t)
+            decls = {k: v for k, v in _decls(dst.get("style", "")).items() if k != "animation"}
+            decls.update(st)
+            dst.set("style", "; ".join(f"{k}:{v}" for k, v in decls.items()))
+        freeze = ET.Element(f"{{{SVG_NS}}}style")
+        freeze.text = "*{animation:none!important}"
+        root.insert(0, freeze)
+        ET.register_namespace("", SVG_NS); ET.register_namespace("xlink", XLINK_NS)
+        return ET.tostring(root, encoding="unicode")
+
+
+def _vars(value, decls):
+    """Substitute `var(--x[, fallback])` with the element's own custom properties."""
+    return re.sub(r"var\((--[\w-]+)\s*(?:,\s*([^)]*))?\)", lambda m: decls.get(m[1], m[2] or ""), value)
+
+
+def _geom_key(tag, el):
+    for xa, ya in (("cx", "cy"), ("x", "y"), ("x1", "y1")):
+        x, y = el.get(xa), el.get(ya)
+        if x is not None and y is not None:
+            try:
+                return f"{tag}@{float(x):g},{float(y):g}"
+            except ValueError:
+                return None
+    return None
+
+
+def _tag(el):
+    return el.tag.rsplit("}", 1)[-1]
+
+
+def diff(svg_a, svg_b, times, tol=1e-3):
+    """Compare two renders at each time; returns [(t, key, prop, a, b), …]."""
+    ta, tb = Timeline(svg_a), Timeline(svg_b)
+    out = []
+    for t in times:
+        sa, sb = ta.sample(t), tb.sample(t)
+        for key in sorted(set(sa) | set(sb)):
+            pa, pb = sa.get(key, {}), sb.get(key, {})
+            for prop in sorted(set(pa) | set(pb)):
+                va, vb = normalize(pa.get(prop)), normalize(pb.get(prop))
+                if va == vb: continue
+                na, nb = _num(va or ""), _num(vb or "")
+                if na and nb and abs(na[0] - nb[0]) <= tol: continue
+                out.append((t, key, prop, va, vb))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="timeline", description="Sample CSS animations in a generated SVG.")
+    ap.add_argument("svg")
+    ap.add_argument("--at", type=float, nargs="*", help="times in seconds (default: every 1s of 28s)")
+    ap.add_argument("--diff", metavar="OTHER", help="report differences against another render")
+    ap.add_argument("--snapshot", metavar="OUT", help="write a static frame at the first --at time")
+    ap.add_argument("--only", nargs="*", help="element keys to print")
+    args = ap.parse_args(argv)
+    with open(args.svg) as f: text = f.read()
+    times = args.at if args.at else [float(t) for t in range(28)]
+
+    if args.diff:
+        with open(args.diff) as f: other = f.read()
+        d = diff(text, other, times)
+        for t, key, prop, a, b in d[:200]:
+            print(f"t={t:6.2f}s  {key:<14} {prop:<13} {a} → {b}")
+        print(f"{'❌' if d else '✅'} {len(d)} differences over {len(times)} samples")
+        return 1 if d else 0
+
+    tl = Timeline(text)
+    if args.snapshot:
+        with open(args.snapshot, "w") as f: f.write(tl.snapshot(times[0]))
+        print(f"✅ {args.snapshot} (t={times[0]}s)")
+        return 0
+    for t in times:
+        print(f"— t={t:.2f}s")
+        for key, st in tl.sample(t).items():
+            if args.only and key not in args.only: continue
+            if st: print(f"  {key:<14} " + "  ".join(f"{k}={v}" for k, v in sorted(st.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+import os, sys
+
+# scripts/ modules import each other flat, as when run as `python scripts/x.py`
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
@@ -0,0 +1,125 @@
+import gzip, io, json, zlib
+from datetime import date, timedelta
+
+import pytest
+
+import calendar_api
+from calendar_api import (calendar_digest, fetch_calendar, iter_body, iter_calendar, pack_calendar,
+                          unpack_calendar)
+
+
+def payload(n_weeks=3):
+    weeks = [{"contributionDays": [
+        {"contributionCount": (w * 7 + d) % 5, "date": (date(2025, 1, 5) + timedelta(w * 7 + d)).isoformat(),
+         "weekday": d} for d in range(7)]} for w in range(n_weeks)]
+    return {"data": {"user": {"name": "Zoë ✨", "contributionsCollection": {"contributionCalendar": {
+        "totalContributions": 123456, "weeks": weeks}}}}}
+
+
+def expected(doc):
+    cal = doc["data"]["user"]["contributionsCollection"]["contributionCalendar"]
+    return cal["totalContributions"], [[{"date": d["date"], "count": d["contributionCount"], "weekday": d["weekday"]}
+                                         for d in w["contributionDays"]] for w in cal["weeks"]]
+
+
+class Response(io.BytesIO):
+    def __init__(self, body, encoding=None):
+        super().__init__(body)
+        self.headers = {"Content-Encoding": encoding} if encoding else {}
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+ENCODINGS = {
+    None: lambda b: b,
+    "gzip": gzip.compress,
+    "deflate": zlib.compress,                                   # zlib-wrapped
+    "raw-deflate": lambda b: (lambda c: c.compress(b) + c.flush())(zlib.compressobj(wbits=-zlib.MAX_WBITS)),
+}
+
+
+def collect(events):
+    total, weeks = None, []
+    for kind, val in events:
+        if kind == "total": total = val
+        elif kind == "week": weeks.append([])
+        else: weeks[-1].append({"date": val["date"], "count": val["contributionCount"], "weekday": val["weekday"]})
+    return total, weeks
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 100, 16384])
+@pytest.mark.parametrize("enc", list(ENCODINGS))
+def test_decodes_every_chunk_split_and_encoding(enc, chunk):
+    doc = payload()
+    body = ENCODINGS[enc](json.dumps(doc, ensure_ascii=False).encode())
+    header = "deflate" if enc == "raw-deflate" else enc
+    assert collect(iter_calendar(iter_body(Response(body, header), chunk))) == expected(doc)
+
+
+def test_pretty_printed_json_and_empty_weeks():
+    doc = payload(2)
+    doc["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"].append({"contributionDays": []})
+    text = json.dumps(doc, indent=2)
+    total, weeks = collect(iter_calendar(text[i:i + 5] for i in range(0, len(text), 5)))
+    assert (total, weeks) == expected(doc)
+    assert weeks[-1] == []
+
+
+def test_error_payload_raises_with_api_errors():
+    body = json.dumps({"data": {"user": None},
+                       "errors": [{"message": "Could not resolve to a User with the login of 'nobody'."}]})
+    with pytest.raises(RuntimeError, match="Could not resolve"):
+        list(iter_calendar(body[i:i + 3] for i in range(0, len(body), 3)))
+
+
+@pytest.mark.parametrize("enc", list(ENCODINGS))
+def test_truncated_body_raises(enc):
+    text = json.dumps(payload(), ensure_ascii=False).encode()
+    header = "deflate" if enc == "raw-deflate" else enc
+    # cut mid-week, between weeks, after the last week and one byte short of the end
+    cuts = [text.index(b'"date"', len(text) // 2), text.index(b']}, {') + 2, text.rindex(b"]") + 1, len(text) - 1]
+    for cut in cuts:
+        body = ENCODINGS[enc](text[:cut])
+        with pytest.raises(RuntimeError, match="truncated"):
+            list(iter_calendar(iter_body(Response(body, header), 64)))
+
+
+def test_malformed_day_raises():
+    text = json.dumps(payload()).replace('"weekday": 3}', '"weekday": 3} oops', 1)
+    with pytest.raises(RuntimeError, match="malformed"):
+        list(iter_calendar(text[i:i + 50] for i in range(0, len(text), 50)))
+
+
+@pytest.mark.parametrize("enc", ["gzip", "deflate", "raw-deflate"])
+def test_truncated_compressed_stream_raises(enc):
+    body = ENCODINGS[enc](json.dumps(payload()).encode())
+    header = "deflate" if enc == "raw-deflate" else enc
+    with pytest.raises(RuntimeError, match="compressed stream ended early"):
+        list(iter_body(Response(body[:len(body) // 2], header), 64))
+
+
+def test_fetch_calendar_requests_compression(monkeypatch):
+    doc, seen = payload(), {}
+    def urlopen(req):
+        seen.update(req.headers)
+        return Response(gzip.compress(json.dumps(doc).encode()), "gzip")
+    monkeypatch.setattr(calendar_api.urllib.request, "urlopen", urlopen)
+    assert fetch_calendar("zoe", "tok") == expected(doc)
+    assert "gzip" in seen["Accept-encoding"]
+
+
+@pytest.mark.parametrize("start, days", [(date(2025, 1, 5), 371), (date(2024, 10, 16), 366), (date(2025, 3, 1), 1)])
+def test_packed_calendar_round_trips(start, days):
+    weeks = []
+    for i in range(days):
+        d = start + timedelta(i); wd = (d.weekday() + 1) % 7
+        if wd == 0 or not weeks: weeks.append([])
+        weeks[-1].append({"date": d.isoformat(), "count": i % 7, "weekday": wd})
+    packed = pack_calendar(days * 3, weeks)
+    assert unpack_calendar(json.loads(json.dumps(packed))) == (days * 3, weeks)
+    assert calendar_digest(unpack_calendar(packed)[1]) == calendar_digest(weeks)
+
+
+def test_empty_packed_calendar():
+    assert unpack_calendar(pack_calendar(0, [])) == (0, [])
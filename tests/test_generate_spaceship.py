@@ -0,0 +1,70 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from generate_spaceship import SHOT_BUDGET, _greedy_groups, _segment, group_targets
+
+
+def grid_of(cols, n=53):
+    """n-week grid with one green cell in each listed column."""
+    return [[{"level": 2 if ci in cols and ri == 3 else 0} for ri in range(7)] for ci in range(n)]
+
+
+def sse(groups):
+    return sum(sum((c - sum(g) / len(g)) ** 2 for c in g) for g in groups)
+
+
+FIXED = {
+    "empty": [],
+    "single": [17],
+    "sparse": [0, 9, 20, 31, 44],
+    "clusters": [1, 2, 3, 10, 11, 25, 26, 27, 28, 40, 52],
+    "every_other": list(range(0, 53, 2)),
+    "dense": list(range(53)),
+    "ragged": [0, 1, 4, 5, 6, 12, 13, 14, 15, 16, 22, 30, 31, 33, 34, 35, 47, 50, 51, 52],
+}
+
+
+@pytest.mark.parametrize("name", FIXED)
+@pytest.mark.parametrize("budget", [1, 4, SHOT_BUDGET])
+def test_groups_fit_the_budget_and_cover_each_column_once(name, budget):
+    cols = FIXED[name]
+    groups = group_targets(grid_of(cols), budget)
+    assert len(groups) <= budget
+    flat = [c for g in groups for c in g]
+    assert flat == cols                        # every green column, once, in order
+    assert all(g for g in groups)
+
+
+def test_random_grids_respect_the_budget():
+    rnd = random.Random(7)
+    for _ in range(200):
+        n = rnd.randint(1, 160)
+        cols = sorted(rnd.sample(range(n), rnd.randint(0, n)))
+        budget = rnd.randint(1, 15)
+        groups = group_targets(grid_of(set(cols), n), budget)
+        assert len(groups) <= budget and [c for g in groups for c in g] == cols
+
+
+def test_sparse_calendars_keep_the_natural_grouping():
+    cols = FIXED["clusters"]
+    assert group_targets(grid_of(cols)) == _greedy_groups(cols)
+
+
+@pytest.mark.parametrize("name", [n for n in FIXED if len(FIXED[n]) > 1])
+def test_dp_is_no_worse_than_greedy_with_as_many_groups(name):
+    tc = FIXED[name]
+    greedy = _greedy_groups(tc)
+    assert sse(_segment(tc, len(greedy))) <= sse(greedy) + 1e-9
+
+
+def test_dp_is_optimal_over_all_contiguous_splits():
+    rnd = random.Random(3)
+    for _ in range(40):
+        tc = sorted(rnd.sample(range(40), rnd.randint(2, 10)))
+        for k in range(1, len(tc) + 1):
+            best = min(sse([tc[i:j] for i, j in zip((0, *cuts), (*cuts, len(tc)))])
+                       for cuts in combinations(range(1, len(tc)), k - 1))
+            groups = _segment(tc, k)
+            assert len(groups) == k and sse(groups) == pytest.approx(best)
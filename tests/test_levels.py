@@ -0,0 +1,62 @@
+import math, random
+
+import pytest
+
+from levels import _select, apply_levels, compute_levels, level_of, quartile_thresholds
+
+
+def sorted_quartiles(counts):
+    active = sorted(c for c in counts if c > 0)
+    if not active:
+        return 0, 0, 0
+    return tuple(active[max(1, math.ceil(len(active) * q / 4)) - 1] for q in (1, 2, 3))
+
+
+CASES = {
+    "all_zero": [0] * 365,
+    "empty": [],
+    "single_nonzero": [0] * 200 + [7] + [0] * 164,
+    "duplicates": [3] * 50 + [0] * 10 + [3] * 40,
+    "two_values": [1, 9] * 30,
+    "few": [0, 5, 0, 2, 8],
+    "ascending": list(range(100)),
+    "descending": list(range(100, 0, -1)),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_quartiles_match_a_sort(name):
+    assert quartile_thresholds(CASES[name]) == sorted_quartiles(CASES[name])
+
+
+def test_random_calendars_match_a_sort():
+    rnd = random.Random(11)
+    for _ in range(300):
+        counts = [rnd.choice([0, 0, 0, rnd.randint(1, 6), rnd.randint(1, 60)]) for _ in range(rnd.randint(0, 400))]
+        assert quartile_thresholds(counts) == sorted_quartiles(counts)
+
+
+def test_select_returns_every_order_statistic():
+    rnd = random.Random(5)
+    vals = [rnd.randint(0, 20) for _ in range(97)]
+    for k in range(len(vals)):
+        assert _select(vals[:], k) == sorted(vals)[k]
+
+
+def test_single_nonzero_day_is_level_one():
+    counts = CASES["single_nonzero"]
+    assert quartile_thresholds(counts) == (7, 7, 7)
+    assert compute_levels(counts) == [0] * 200 + [1] + [0] * 164
+
+
+@pytest.mark.parametrize("c, level", [(-1, 0), (0, 0), (1, 1), (2, 1), (3, 2), (5, 2), (6, 3), (9, 3), (10, 4), (99, 4)])
+def test_level_boundaries_are_inclusive(c, level):
+    assert level_of(c, (2, 5, 9)) == level
+
+
+def test_apply_levels_matches_compute_levels():
+    rnd = random.Random(2)
+    grid = [[{"count": rnd.choice([0, 1, 4, 12])} for _ in range(7)] for _ in range(53)]
+    flat = [d["count"] for w in grid for d in w]
+    apply_levels(grid)
+    assert [d["level"] for w in grid for d in w] == compute_levels(flat)
@@ -0,0 +1,44 @@
+import json
+
+import pipeline
+from calendar_api import pack_calendar
+
+WEEKS = [[{"date": "2025-01-05", "count": 2, "weekday": 0}, {"date": "2025-01-06", "count": 0, "weekday": 1}]]
+
+
+def fake(monkeypatch, tmp_path, fetched=(2, WEEKS)):
+    calls = {"fetch": 0, "run": []}
+    def fetch(user, token):
+        calls["fetch"] += 1
+        return fetched
+    def run(user, token, out, workers=1, only=None, prefetched=None):
+        calls["run"].append(prefetched)
+        return {}, {}
+    monkeypatch.setattr(pipeline, "fetch_calendar", fetch)
+    monkeypatch.setattr(pipeline, "run", run)
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / "gh_output"))
+    monkeypatch.delenv("CALENDAR_PAYLOAD", raising=False)
+    return calls
+
+
+def outputs(tmp_path):
+    return (tmp_path / "gh_output").read_text().split()
+
+
+def test_skip_unchanged_renders_only_when_the_calendar_changes(monkeypatch, tmp_path):
+    calls = fake(monkeypatch, tmp_path)
+    argv = ["--user", "zoe", "--skip-unchanged", str(tmp_path / "digests")]
+    assert pipeline.main(argv) == 0 and pipeline.main(argv) == 0
+    assert calls["fetch"] == 2 and calls["run"] == [(2, WEEKS)]
+    assert outputs(tmp_path) == ["changed=true", "changed=false"]
+
+
+def test_dispatch_payload_replaces_the_fetch(monkeypatch, tmp_path):
+    calls = fake(monkeypatch, tmp_path)
+    monkeypatch.setenv("CALENDAR_PAYLOAD", json.dumps({"user": "zoe", **pack_calendar(2, WEEKS)}))
+    assert pipeline.main(["--user", "zoe", "--skip-unchanged", str(tmp_path / "d")]) == 0
+    assert calls["fetch"] == 0 and calls["run"] == [(2, WEEKS)]
+    # another user's payload is ignored
+    assert pipeline.main(["--user", "bob"]) == 0
+    assert calls["run"][-1] is None
@@ -0,0 +1,154 @@
+import json, threading
+
+import pytest
+
+import refresh_scheduler
+from refresh_scheduler import DispatchJob, RefreshScheduler, RenderJob, TokenBucket
+
+
+class Clock:
+    def __init__(self): self.t = 1000.0
+    def __call__(self): return self.t
+
+
+def scheduler(job=None, **kw):
+    calls = []
+    def record(user):
+        calls.append(user)
+        return job(user) if job else True
+    clock = Clock()
+    return RefreshScheduler(record, clock=clock, **kw), clock, calls
+
+
+def drain(sched):
+    while sched.status()["running"]:
+        sched.wait(0.05)
+
+
+def test_token_bucket_refills_continuously_up_to_capacity():
+    clock = Clock()
+    b = TokenBucket(2, 10, clock=clock)        # one call per 5s
+    assert b.take() and b.take() and not b.take()
+    assert b.wait_time() == pytest.approx(5)
+    clock.t += 2.5
+    assert not b.take() and b.wait_time() == pytest.approx(2.5)
+    clock.t += 2.5
+    assert b.take()
+    clock.t += 1000
+    assert b.take() and b.take() and not b.take()
+
+
+def test_debounce_restarts_on_each_trigger():
+    sched, clock, calls = scheduler(debounce=60, max_wait=600)
+    sched.trigger("alice")
+    clock.t += 59
+    assert sched.tick() == 0
+    sched.trigger("alice")
+    clock.t += 59
+    assert sched.tick() == 0
+    clock.t += 1
+    assert sched.tick() == 1
+    drain(sched)
+    assert calls == ["alice"]
+
+
+def test_max_wait_bounds_a_steady_trickle():
+    sched, clock, calls = scheduler(debounce=60, max_wait=100)
+    for _ in range(3):                         # t = 0, 30, 60: debounce never elapses
+        sched.trigger("alice"); assert sched.tick() == 0
+        clock.t += 30
+    clock.t += 9                               # t = 99
+    assert sched.tick() == 0
+    clock.t += 1
+    assert sched.tick() == 1
+    drain(sched)
+    assert calls == ["alice"]
+
+
+def test_bursts_coalesce_into_one_run():
+    sched, clock, calls = scheduler(debounce=10)
+    for _ in range(5):
+        sched.trigger("alice"); sched.trigger("bob")
+    clock.t += 10
+    assert sched.tick() == 2
+    drain(sched)
+    assert sorted(calls) == ["alice", "bob"]
+    st = sched.status()
+    assert (st["triggers"], st["runs"], st["api_calls"], st["pending"]) == (10, 2, 2, [])
+
+
+def test_budget_exhaustion_defers_runs_without_busy_polling():
+    sched, clock, calls = scheduler(debounce=0, budget=(2, 100))   # one call per 50s
+    for u in ("a", "b", "c"):
+        sched.trigger(u)
+    assert sched.tick() == 2
+    drain(sched)
+    assert sched.tick() == 0 and sched.status()["pending"] == ["c"]
+    assert sched.next_wake() == 1.0            # sleeps toward the refill, not 20 Hz
+    clock.t += 49
+    assert sched.tick() == 0
+    clock.t += 1
+    assert sched.tick() == 1
+    drain(sched)
+    assert sorted(calls) == ["a", "b", "c"]
+
+
+def test_concurrency_cap_waits_for_a_finished_run():
+    release = threading.Event()
+    sched, clock, calls = scheduler(lambda u: release.wait(5), debounce=0, concurrency=1)
+    sched.trigger("a"); sched.trigger("b")
+    assert sched.tick() == 1
+    assert sched.tick() == 0 and sched.next_wake() == 1.0
+    sched.trigger("a")                         # triggered while running: queued again
+    release.set()
+    drain(sched)
+    assert sched.tick() == 1
+    drain(sched)
+    assert sched.tick() == 1
+    drain(sched)
+    assert sorted(calls) == ["a", "a", "b"]
+
+
+def test_next_wake_tracks_the_soonest_due_user():
+    sched, clock, _ = scheduler(debounce=0.5)
+    assert sched.next_wake() == 1.0
+    sched.trigger("alice")
+    assert sched.next_wake() == pytest.approx(0.5)
+
+
+def test_recently_changed_users_go_first():
+    sched, clock, calls = scheduler(debounce=0, concurrency=1)
+    sched.last_changed = {"b": 5.0, "c": 9.0}
+    for u in ("a", "b", "c"):
+        sched.trigger(u)
+    for _ in range(3):
+        assert sched.tick() == 1
+        drain(sched)
+    assert calls == ["c", "b", "a"]
+
+
+def test_render_job_skips_unchanged_calendars(monkeypatch):
+    weeks = [[{"date": "2025-01-05", "count": 1, "weekday": 0}]]
+    monkeypatch.setattr(refresh_scheduler, "fetch_calendar", lambda user, token: (1, weeks))
+    published = []
+    job = RenderJob("tok", "out")
+    job.publish = lambda *a: published.append(a) or True
+    assert job("alice") and not job("alice")
+    weeks = [[{"date": "2025-01-05", "count": 2, "weekday": 0}]]
+    assert job("alice")
+    assert len(published) == 2
+
+
+def test_dispatch_carries_user_and_packed_calendar(monkeypatch):
+    sent = []
+    class Resp:
+        status = 204
+        def __enter__(self): return self
+        def __exit__(self, *exc): return False
+    monkeypatch.setattr(refresh_scheduler.urllib.request, "urlopen", lambda req: sent.append(req) or Resp())
+    weeks = [[{"date": "2025-01-07", "count": 3, "weekday": 2}]]
+    assert DispatchJob("tok", "o/r").publish("alice", 3, weeks)
+    body = json.loads(sent[0].data)
+    assert sent[0].full_url == "https://api.github.com/repos/o/r/dispatches"
+    assert body == {"event_type": "refresh",
+                    "client_payload": {"user": "alice", "total": 3, "start": "2025-01-07", "counts": [3]}}
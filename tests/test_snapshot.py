@@ -0,0 +1,82 @@
+import random, struct, sys
+from datetime import date, timedelta
+
+import pytest
+
+import snapshot
+from generate_spaceship import grid_from_weeks
+from generate_stats import flatten_days
+from snapshot import GridView, Snapshot, write_snapshot
+
+
+def calendar(start, n, seed):
+    """Weeks shaped like fetch_calendar(): Sunday-first, partial first/last week."""
+    rng = random.Random(seed)
+    weeks, cur = [], []
+    for i in range(n):
+        d = start + timedelta(i)
+        wd = (d.weekday() + 1) % 7
+        if wd == 0 and cur:
+            weeks.append(cur); cur = []
+        cur.append({"date": d.isoformat(), "count": rng.choice([0, 0, 1, 3, 8, 70000]), "weekday": wd})
+    weeks.append(cur)
+    return weeks
+
+
+CALS = {
+    "wed": calendar(date(2025, 10, 22), 365, 1),   # starts mid-week
+    "sat": calendar(date(2025, 10, 18), 371, 2),   # 54 columns
+    "sun": calendar(date(2024, 1, 7), 800, 3),
+    "ünï": calendar(date(2025, 6, 1), 10, 4),      # non-ASCII name, tiny calendar
+}
+
+
+@pytest.fixture
+def snap(tmp_path):
+    path = write_snapshot(str(tmp_path / "cal.snap"), CALS)
+    with Snapshot(path) as s:
+        yield s
+
+
+def test_users_and_days_round_trip(snap):
+    assert snap.users() == list(CALS)
+    for user, weeks in CALS.items():
+        view = snap.user(user)
+        assert list(view.days()) == flatten_days(weeks)
+        assert view.total == sum(d["count"] for w in weeks for d in w)
+        assert view.days()[-1] == flatten_days(weeks)[-1]
+
+
+def test_grid_matches_grid_from_weeks(snap):
+    for user, weeks in CALS.items():
+        view = snap.user(user)
+        grid, dates = grid_from_weeks(weeks)
+        assert [list(col) for col in view.grid()] == grid
+        assert view.week_dates() == dates
+
+
+def test_grid_slices_are_views(snap):
+    grid = snap.user("sun").grid()
+    full = list(grid)
+    part = grid[10:63]
+    assert isinstance(part, GridView) and len(part) == 53
+    assert list(part) == full[10:63]
+    assert list(part[5:8]) == full[15:18]
+    assert part[-1] == full[62]
+    with pytest.raises(IndexError):
+        part[53]
+
+
+def test_byte_swap_path_decodes_foreign_endian_counts():
+    # what a host of the other byte order sees when it reads the file natively
+    foreign = ">" if sys.byteorder == "little" else "<"
+    values = [0, 1, 3, 70000, 2**32 - 1]
+    swapped = snapshot._swapped(memoryview(struct.pack(f"{foreign}{len(values)}I", *values)))
+    assert list(swapped) == values
+
+
+def test_rejects_foreign_files(tmp_path):
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(struct.pack("<4sHHIQQQ", b"NOPE", 1, 0, 0, 0, 0, 0))
+    with pytest.raises(ValueError):
+        Snapshot(str(bad))
@@ -0,0 +1,106 @@
+import math, random
+from datetime import date, timedelta
+
+import pytest
+
+import stats_index
+from stats_index import StatsIndex
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    """Run each test on both paths, so the NumPy and pure-Python builds can't drift."""
+    if request.param == "numpy":
+        monkeypatch.setattr(stats_index, "np", pytest.importorskip("numpy"))
+    else:
+        monkeypatch.setattr(stats_index, "np", None)
+    return request.param
+
+
+def calendar(seed, n_days=400, start=date(2023, 3, 15)):
+    """Days with gaps (missing = 0) and repeated dates (summed), as a dict and a list."""
+    rnd = random.Random(seed)
+    by_day, days = {}, []
+    for i in range(n_days):
+        if rnd.random() < .15: continue
+        d = start + timedelta(i); c = rnd.choice([0, 0, 1, 2, 5, rnd.randint(0, 40)])
+        days.append({"date": d.isoformat(), "count": c})
+        by_day[d] = by_day.get(d, 0) + c
+        if rnd.random() < .05:
+            days.append({"date": d.isoformat(), "count": 3}); by_day[d] += 3
+    return by_day, days
+
+
+def span(by_day):
+    lo, hi = min(by_day), max(by_day)
+    return [lo + timedelta(i) for i in range((hi - lo).days + 1)]
+
+
+def brute_range_sum(by_day, a, b):
+    return sum(c for d, c in by_day.items() if a <= d <= b)
+
+
+def brute_rolling_avg(by_day, window, end):
+    e = min(end, max(by_day))
+    return sum(c for d, c in by_day.items() if e - timedelta(window) < d <= e) / window
+
+
+def brute_percentile(by_day, p):
+    vals = sorted(by_day.get(d, 0) for d in span(by_day))
+    return vals[min(len(vals) - 1, max(0, math.ceil(p / 100 * len(vals)) - 1))]
+
+
+def brute_best_week(by_day):
+    weeks = {}
+    for d in span(by_day):
+        sunday = d - timedelta((d.weekday() + 1) % 7)
+        weeks.setdefault(max(sunday, min(by_day)), 0)
+        weeks[max(sunday, min(by_day))] += by_day.get(d, 0)
+    best = max(weeks.values())
+    return next(d.isoformat() for d, s in sorted(weeks.items()) if s == best), best
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_queries_match_brute_force(backend, seed):
+    by_day, days = calendar(seed)
+    idx = StatsIndex(days)
+    lo, hi = min(by_day), max(by_day)
+    assert idx.total == sum(by_day.values())
+    assert (idx.first_date, idx.last_date) == (lo.isoformat(), hi.isoformat())
+    rnd = random.Random(seed)
+    for _ in range(200):
+        a = lo + timedelta(rnd.randint(-20, 420)); b = a + timedelta(rnd.randint(-5, 120))
+        assert idx.range_sum(a, b) == brute_range_sum(by_day, a, b)
+        assert idx.range_sum(a.isoformat(), b.isoformat()) == brute_range_sum(by_day, a, b)
+        w = rnd.randint(1, 60)
+        assert idx.rolling_avg(w, a) == pytest.approx(brute_rolling_avg(by_day, w, a))
+    assert idx.rolling_avg(30) == pytest.approx(brute_rolling_avg(by_day, 30, hi))
+    for p in (0, 1, 10, 25, 50, 75, 90, 99, 100, 33.3):
+        assert idx.percentile(p) == brute_percentile(by_day, p)
+    assert idx.best_week() == brute_best_week(by_day)
+
+
+def test_from_counts_matches_days(backend):
+    by_day, days = calendar(9)
+    lo = min(by_day)
+    counts = [by_day.get(d, 0) for d in span(by_day)]
+    a, b = StatsIndex(days), StatsIndex.from_counts(lo, counts)
+    assert (a.total, a.best_week(), a.best_month(), a.busiest_weekday()) == \
+           (b.total, b.best_week(), b.best_month(), b.busiest_weekday())
+    assert a.weekday_totals == b.weekday_totals and a.month_totals == b.month_totals
+
+
+def test_accumulators_match_brute_force(backend):
+    by_day, days = calendar(4)
+    idx = StatsIndex(days)
+    wd = [0] * 7; months = {}
+    for d in span(by_day):
+        c = by_day.get(d, 0)
+        wd[(d.weekday() + 1) % 7] += c
+        months[(d.year, d.month)] = months.get((d.year, d.month), 0) + c
+    assert list(idx.weekday_totals) == wd and idx.month_totals == months
+
+
+def test_empty_calendar(backend):
+    idx = StatsIndex([])
+    assert (idx.total, idx.percentile(50), idx.best_week(), idx.range_sum("2024-01-01", "2024-12-31")) == (0, 0, ("", 0), 0)
@@ -0,0 +1,72 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from team_store import TeamStore
+
+D0 = date(2025, 1, 1).toordinal()
+
+
+def brute(days):
+    """(runs by day, current, longest, total) recomputed from scratch."""
+    runs, run, prev = {}, 0, None
+    for d in sorted(days):
+        run = (run + 1 if prev == d - 1 else 1) if days[d] > 0 else 0
+        runs[d], prev = run, d
+    return runs, runs[max(days)], max(runs.values()), sum(days.values())
+
+
+@pytest.fixture
+def store(tmp_path):
+    with TeamStore(str(tmp_path / "team.db")) as s:
+        yield s
+
+
+def stored(store, user):
+    rows = store.db.execute("SELECT day, count, run FROM contributions WHERE user=?", (user,)).fetchall()
+    return {d: c for d, c, _ in rows}, {d: r for d, _, r in rows}
+
+
+def test_upsert_matches_brute_force_over_overlapping_syncs(store):
+    rng = random.Random(7)
+    truth = {}
+    for _ in range(300):
+        lo = rng.randrange(0, 120)
+        batch = [(date.fromordinal(D0 + d), rng.choice([0, 0, 1, 2, 5]))
+                 for d in range(lo, lo + rng.randrange(1, 40))]
+        store.upsert("alice", batch)
+        truth.update((d.toordinal(), c) for d, c in batch)
+        counts, runs = stored(store, "alice")
+        want_runs, current, longest, total = brute(truth)
+        assert counts == truth
+        assert runs == want_runs
+        assert store.db.execute("SELECT current, longest, total FROM streaks WHERE user='alice'").fetchone() \
+            == (current, longest, total)
+
+
+def test_upsert_is_idempotent_and_stops_at_convergence(store):
+    days = [(date.fromordinal(D0 + d), 1) for d in range(30)]
+    assert store.upsert("bob", days) == 30
+    assert store.upsert("bob", days) == 0
+    # breaking day 10 rewrites it and the runs after it, up to the end of the streak
+    assert store.upsert("bob", [(date.fromordinal(D0 + 10), 0)]) == 20
+    # changing a count without changing activity touches one row only
+    assert store.upsert("bob", [(date.fromordinal(D0 + 5), 4)]) == 1
+    _, runs = stored(store, "bob")
+    assert runs[D0 + 9] == 10 and runs[D0 + 10] == 0 and runs[D0 + 29] == 19
+
+
+def test_iso_dates_and_calendar_weeks(store):
+    weeks = [[{"date": (date(2025, 3, 2) + timedelta(w * 7 + d)).isoformat(), "count": d % 2, "weekday": d}
+              for d in range(7)] for w in range(2)]
+    store.upsert_calendar("carol", weeks)
+    assert store.top_streaks() == [("carol", 0, 1, 6)]
+
+
+def test_stale_current_streak_is_not_ranked(store):
+    store.upsert("fresh", [(date.fromordinal(D0 + d), 1) for d in range(95, 100)])
+    store.upsert("stale", [(date.fromordinal(D0 + d), 1) for d in range(0, 60)])
+    store.upsert("yesterday", [(date.fromordinal(D0 + d), 1) for d in range(90, 99)])
+    assert store.top_streaks() == [("yesterday", 9, 9, 9), ("fresh", 5, 5, 5), ("stale", 0, 60, 60)]
+    assert store.top_streaks(by="longest")[0] == ("stale", 0, 60, 60)
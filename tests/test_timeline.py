@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from timeline import TIMING, Timeline, diff, interpolate, parse_animation
+
+KF = {"pulse": [], "fade": []}
+
+
+def svg(css, body):
+    return f'<svg xmlns="http://www.w3.org/2000/svg"><style>{css}</style>{body}</svg>'
+
+
+PULSE = """@keyframes pulse {
+  0%,20% { fill:#000000; opacity:0; }
+  50% { fill:#ffffff; opacity:1; }
+  100% { fill:#000000; opacity:0; }
+}"""
+
+
+def test_parse_animation_shorthand():
+    [a] = parse_animation("pulse 28s linear infinite", KF)
+    assert (a["name"], a["duration"], a["delay"], a["timing"], a["iterations"]) == ("pulse", 28, 0, None, math.inf)
+    [a] = parse_animation("500ms ease-in 2s 3 both alternate pulse", KF)
+    assert (a["name"], a["duration"], a["delay"], a["timing"], a["iterations"], a["fill"], a["direction"]) == \
+           ("pulse", .5, 2, TIMING["ease-in"], 3, "both", "alternate")
+    [a] = parse_animation("pulse 1s steps(4,jump-start)", KF)
+    assert a["timing"] == ("steps", 4, "start")
+    [a] = parse_animation("pulse 1s cubic-bezier(0.1, 0.2, 0.3, 0.4)", KF)
+    assert a["timing"] == (.1, .2, .3, .4)
+
+
+def test_parse_animation_lists_and_none():
+    anims = parse_animation("pulse 1s linear, fade 2s 1s ease", KF)
+    assert [(a["name"], a["duration"], a["delay"]) for a in anims] == [("pulse", 1, 0), ("fade", 2, 1)]
+    assert parse_animation("none", KF) == []
+
+
+@pytest.mark.parametrize("a, b, f, out", [
+    ("#000000", "#ffffff", 0, "#000000"),
+    ("#000000", "#ffffff", 1, "#ffffff"),
+    ("#000000", "#ffffff", .5, "#808080"),
+    ("0", "1", .25, "0.25"),
+    ("10px", "20px", .5, "15px"),
+    ("0", "8px", .5, "4px"),                   # unitless zero takes the other unit
+    ("scale(1)", "scale(1.6)", .5, "scale(1.3)"),
+    ("none", "block", .49, "none"),            # discrete values flip at the midpoint
+    ("none", "block", .5, "block"),
+])
+def test_interpolate(a, b, f, out):
+    assert interpolate(a, b, f) == out
+
+
+def test_keyframe_boundaries():
+    tl = Timeline(svg(PULSE + ".p { animation:pulse 10s linear infinite; }", '<rect class="p"/>'))
+    at = lambda t: tl.sample(t)["p"]
+    assert at(0) == at(2) == {"fill": "#000000", "opacity": "0"}     # hold across the shared 0%,20% stop
+    assert at(5) == {"fill": "#ffffff", "opacity": "1"}
+    assert at(3.5)["opacity"] == "0.5"
+    assert at(10) == at(0)                                          # next iteration starts over
+
+
+def test_delay_and_iterations():
+    tl = Timeline(svg(PULSE + ".a { animation:pulse 10s linear 4s 2; } .b { animation:pulse 10s linear 4s 2 both; }",
+                      '<rect class="a" opacity=".3"/><rect class="b"/>'))
+    s = lambda t: tl.sample(t)
+    assert s(3)["a"] == {} and s(3)["b"] == {"fill": "#000000", "opacity": "0"}   # before the delay
+    assert s(9)["a"]["opacity"] == "1" and s(19)["a"]["opacity"] == "1"         # both iterations
+    assert s(24.5)["a"] == {}                                                    # finished, fill none
+    assert s(24.5)["b"] == {"fill": "#000000", "opacity": "0"}                   # fill both holds the end
+
+
+def test_inline_var_delay():
+    tl = Timeline(svg(PULSE + ".st { animation:pulse 10s linear var(--l) infinite; }",
+                      '<circle class="st" cx="1" cy="1" style="--l:5s"/><circle class="st" cx="2" cy="2" style="--l:0s"/>'))
+    s = tl.sample(5)
+    assert s["circle@1,1"]["opacity"] == "0" and s["circle@2,2"]["opacity"] == "1"
+
+
+CELLS = PULSE + ".c1 { animation:pulse 10s linear infinite; } .c2 { animation:pulse 10s linear 1s infinite; }"
+
+
+def test_diff_identical_renders_is_empty():
+    a = svg(CELLS, '<rect class="c1" x="1" y="1"/><rect class="c2" x="2" y="2"/>')
+    assert diff(a, a, [t / 2 for t in range(20)]) == []
+
+
+def test_diff_ignores_markup_refactors():
+    a = svg(CELLS, '<rect class="c1" fill="#000" x="1" y="1"/><rect class="c2" x="2" y="2"/>')
+    b = svg(CELLS, '<g fill="#000"><rect class="c2" x="2" y="2"/><rect class="c1" x="1" y="1"/></g>')
+    assert diff(a, b, [t / 2 for t in range(20)]) == []
+
+
+def test_diff_reports_a_shifted_animation():
+    a = svg(CELLS, '<rect class="c1"/><rect class="c2"/>')
+    b = svg(CELLS.replace("linear 1s", "linear 1.5s"), '<rect class="c1"/><rect class="c2"/>')
+    d = diff(a, b, [0.0, 5.0, 6.0])
+    assert d and {key for _, key, _, _, _ in d} == {"c2"}
+    assert (6.0, "c2", "opacity", "1", "0.8333") in d